@@ -0,0 +1,146 @@
+"""
+Per-operation AWS API tracing through botocore event hooks.
+
+When enabled (cli --profile_api), every client created by utils.get_client
+records call counts, latency, bytes sent/received, retries and throttles per
+operation. report() prints the summary as a text table or JSON.
+"""
+import json
+import sys
+import threading
+import time
+from typing import Dict
+
+from utils import THROTTLE_CODES, rate_limiter_stats, register_client_hook
+
+_lock = threading.Lock()
+_stats: Dict[str, Dict] = {}
+_enabled = False
+
+
+def _entry(operation: str) -> Dict:
+    entry = _stats.get(operation)
+    if entry is None:
+        entry = _stats[operation] = {"latencies": [], "bytes_sent": 0, "bytes_received": 0,
+                                     "retries": 0, "throttles": 0, "errors": 0}
+    return entry
+
+
+def _operation(service: str, model) -> str:
+    return f"{service}.{model.name}"
+
+
+def _attach(client, service: str):
+    events = client.meta.events
+
+    def before_call(model, context, **_kwargs):
+        context["api_trace_started"] = time.perf_counter()
+
+    def before_send(request, event_name, **_kwargs):
+        # event_name is before-send.<service-id>.<Operation>; counted once per attempt
+        length = request.headers.get("Content-Length") or request.headers.get("X-Amz-Decoded-Content-Length")
+        if length:
+            size = int(length)
+        elif isinstance(request.body, (bytes, str)):
+            size = len(request.body)
+        else:
+            size = 0
+        with _lock:
+            _entry(f"{service}.{event_name.rsplit('.', 1)[-1]}")["bytes_sent"] += size
+
+    def after_call(http_response, parsed, model, context, **_kwargs):
+        started = context.get("api_trace_started")
+        latency = time.perf_counter() - started if started else 0.0
+        received = http_response.headers.get("content-length")
+        if received and received.isdigit():
+            received = int(received)
+        elif not model.has_streaming_output:
+            received = len(http_response.content or b"")
+        else:
+            received = 0
+        with _lock:
+            entry = _entry(_operation(service, model))
+            entry["latencies"].append(latency)
+            entry["bytes_received"] += received
+            entry["retries"] += parsed.get("ResponseMetadata", {}).get("RetryAttempts", 0)
+            if parsed.get("Error"):
+                entry["errors"] += 1
+
+    def after_call_error(model, context, **_kwargs):
+        started = context.get("api_trace_started")
+        with _lock:
+            entry = _entry(_operation(service, model))
+            entry["latencies"].append(time.perf_counter() - started if started else 0.0)
+            entry["errors"] += 1
+
+    def needs_retry(response, operation, **_kwargs):
+        if not response:
+            return None
+        code = response[1].get("Error", {}).get("Code")
+        if code in THROTTLE_CODES:
+            with _lock:
+                _entry(_operation(service, operation))["throttles"] += 1
+        return None
+
+    events.register("before-call", before_call)
+    events.register_first("before-send", before_send)
+    events.register("after-call", after_call)
+    events.register("after-call-error", after_call_error)
+    events.register("needs-retry", needs_retry)
+
+
+def enable():
+    """Start tracing every client the registry creates (idempotent)."""
+    global _enabled
+    if not _enabled:
+        _enabled = True
+        register_client_hook(_attach)
+
+
+def _percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def summary() -> Dict[str, Dict]:
+    """Return the per-operation statistics collected so far."""
+    with _lock:
+        snapshot = {op: dict(entry, latencies=list(entry["latencies"])) for op, entry in _stats.items()}
+    result = {}
+    for op, entry in sorted(snapshot.items()):
+        latencies = entry.pop("latencies")
+        result[op] = {
+            "calls": len(latencies),
+            "p50_ms": round(_percentile(latencies, 50) * 1000, 1) if latencies else 0.0,
+            "p95_ms": round(_percentile(latencies, 95) * 1000, 1) if latencies else 0.0,
+            "max_ms": round(max(latencies) * 1000, 1) if latencies else 0.0,
+            **entry,
+        }
+    return result
+
+
+def report(fmt: str = "text", stream=None):
+    """Write the summary to stderr (default) as a text table or JSON."""
+    stream = stream or sys.stderr
+    stats = summary()
+    limiters = rate_limiter_stats()
+    if fmt == "json":
+        stream.write(json.dumps({"operations": stats, "rate_limiters": limiters}, indent=1) + "\n")
+        return
+    if not stats:
+        stream.write("API profile: no AWS calls made.\n")
+        return
+    header = ["OPERATION", "CALLS", "P50 MS", "P95 MS", "MAX MS", "SENT KB", "RECV KB", "RETRIES", "THROTTLES", "ERRORS"]
+    rows = [[op, s["calls"], s["p50_ms"], s["p95_ms"], s["max_ms"], round(s["bytes_sent"] / 1024, 1),
+             round(s["bytes_received"] / 1024, 1), s["retries"], s["throttles"], s["errors"]]
+            for op, s in stats.items()]
+    widths = [max(len(str(row[i])) for row in [header] + rows) for i in range(len(header))]
+    stream.write("API profile:\n")
+    for row in [header] + rows:
+        stream.write("  ".join(str(col).ljust(w) for col, w in zip(row, widths)).rstrip() + "\n")
+    if limiters:
+        stream.write("Rate limiters:\n")
+        for service, l in limiters.items():
+            stream.write(f"{service}: {l['rate']:g} req/s, waited {l['wait_seconds']:.2f}s over {l['waits']} call(s), "
+                         f"{l['throttles']} throttle(s)\n")
@@ -0,0 +1,314 @@
+"""
+Offline benchmark for every cli.py command.
+
+Each command runs in-process against moto's local AWS stand-in, once per
+fixture size (buckets, zones, records, objects and instances). For every
+command and size it reports wall-clock time, the number of AWS API calls the
+CLI made and the peak Python memory allocated while it ran. Results can be
+saved as a JSON baseline; later runs compared against it fail (exit 1) when
+a metric grows past the threshold, which catches N+1 call patterns early.
+Any command that exits non-zero or prints an error also fails the run, so a
+benchmark never silently times an error path.
+
+Needs moto (not a runtime dependency):
+    pip install "moto[s3,ec2,route53,ssm,resourcegroupstaggingapi]"
+
+Usage:
+    python benchmarks/commands.py --sizes 10,1000 --save_baseline benchmarks/baseline.json
+    python benchmarks/commands.py --sizes 10,1000 --baseline benchmarks/baseline.json --threshold 0.25
+    python benchmarks/commands.py --only list-s3,list-route53
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+PROFILE = "duvie-platform-cli"
+REGION = "us-east-1"
+DEFAULT_SIZES = "10,1000,10000"
+DEFAULT_THRESHOLD = 0.25
+
+# Growth below these absolute amounts is noise, not a regression
+MIN_TIME_DELTA = 0.05
+MIN_MEMORY_DELTA_MB = 1.0
+
+OBJECTS_BUCKET = "bench-objects"
+RECORDS_ZONE = "records.bench.example.com"
+
+_api_calls = 0
+
+
+def _count_call(**_kwargs):
+    global _api_calls
+    _api_calls += 1
+
+
+def _isolate_environment(workdir):
+    """Point boto3 and the CLI caches at throwaway files with fake credentials."""
+    credentials = os.path.join(workdir, "credentials")
+    with open(credentials, "w") as f:
+        f.write(f"[{PROFILE}]\naws_access_key_id = testing\naws_secret_access_key = testing\n")
+    config = os.path.join(workdir, "config")
+    with open(config, "w") as f:
+        f.write(f"[profile {PROFILE}]\nregion = {REGION}\n")
+    os.environ.update({
+        "AWS_SHARED_CREDENTIALS_FILE": credentials,
+        "AWS_CONFIG_FILE": config,
+        "XDG_CACHE_HOME": os.path.join(workdir, "cache"),
+    })
+    for var in ("AWS_PROFILE", "AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY", "AWS_SESSION_TOKEN"):
+        os.environ.pop(var, None)
+
+
+class _Discard(io.TextIOBase):
+    """Throw command output away, keeping the first error line for the report."""
+
+    def __init__(self):
+        self.first_error = None
+
+    def write(self, text):
+        if self.first_error is None and text.startswith("Error"):
+            self.first_error = text.strip()
+        return len(text)
+
+
+def _install_call_counter():
+    """Count every API call made by clients the CLI creates through utils."""
+    import utils
+
+    utils.register_client_hook(lambda client, _service: client.meta.events.register("before-call", _count_call))
+
+
+def build_fixtures(size, workdir):
+    """Create `size` buckets, zones, records, objects and instances; return command inputs."""
+    import boto3
+    from utils import default_tags
+
+    s3 = boto3.client("s3", region_name=REGION)
+    r53 = boto3.client("route53", region_name=REGION)
+    ec2 = boto3.client("ec2", region_name=REGION)
+
+    # Half the buckets and zones belong to the CLI, half do not
+    for i in range(size):
+        name = f"bench-bucket-{size}-{i}"
+        s3.create_bucket(Bucket=name)
+        if i % 2 == 0:
+            s3.put_bucket_tagging(Bucket=name, Tagging={"TagSet": default_tags()})
+    s3.create_bucket(Bucket=OBJECTS_BUCKET)
+    s3.put_bucket_tagging(Bucket=OBJECTS_BUCKET, Tagging={"TagSet": default_tags()})
+    for i in range(size):
+        s3.put_object(Bucket=OBJECTS_BUCKET, Key=f"data/{i % 10}/object-{i}", Body=b"x" * 64)
+
+    for i in range(size):
+        zone_id = r53.create_hosted_zone(Name=f"bench{i}.example.com", CallerReference=f"bench-{size}-{i}")["HostedZone"]["Id"]
+        if i % 2 == 0:
+            r53.change_tags_for_resource(ResourceType="hostedzone", ResourceId=zone_id.split("/")[-1],
+                                         AddTags=default_tags())
+    zone_id = r53.create_hosted_zone(Name=RECORDS_ZONE, CallerReference=f"records-{size}")["HostedZone"]["Id"]
+    r53.change_tags_for_resource(ResourceType="hostedzone", ResourceId=zone_id.split("/")[-1], AddTags=default_tags())
+    records = [{"Name": f"host{i}.{RECORDS_ZONE}.", "Type": "A", "TTL": 300,
+                "ResourceRecords": [{"Value": f"10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}"}]}
+               for i in range(size)]
+    for start in range(0, size, 1000):
+        r53.change_resource_record_sets(HostedZoneId=zone_id, ChangeBatch={"Changes": [
+            {"Action": "CREATE", "ResourceRecordSet": r} for r in records[start:start + 1000]]})
+
+    # Desired state for route53-apply: every tenth record gets a new TTL
+    record_file = os.path.join(workdir, f"records-{size}.json")
+    with open(record_file, "w") as f:
+        json.dump([{**r, "TTL": 60 if i % 10 == 0 else 300} for i, r in enumerate(records)], f)
+
+    for start in range(0, size, 1000):
+        count = min(1000, size - start)
+        ec2.run_instances(ImageId="ami-12c6146b", InstanceType="t3.micro", MinCount=count, MaxCount=count,
+                          TagSpecifications=[{"ResourceType": "instance", "Tags": default_tags()}])
+
+    upload_file = os.path.join(workdir, "upload.txt")
+    with open(upload_file, "w") as f:
+        f.write("benchmark upload\n")
+    sync_dir = os.path.join(workdir, f"sync-{size}")
+    os.makedirs(sync_dir, exist_ok=True)
+    for i in range(min(size, 200)):
+        with open(os.path.join(sync_dir, f"file-{i}.txt"), "w") as f:
+            f.write(f"file {i}\n")
+
+    # A small runbook for batch: repeated lookups that should reuse warm clients
+    batch_file = os.path.join(workdir, f"batch-{size}.txt")
+    with open(batch_file, "w") as f:
+        f.write(f"list-s3-files --bucket_name {OBJECTS_BUCKET} --max_keys 10\n" * 10)
+        f.write("list-route53\n" * 10)
+
+    return {"zone_id": zone_id, "record_file": record_file, "upload_file": upload_file, "sync_dir": sync_dir,
+            "batch_file": batch_file, "zone_file": os.path.join(workdir, f"zone-{size}.zone"),
+            "download_dir": os.path.join(workdir, f"download-{size}")}
+
+
+def commands(size, ctx):
+    """Return (label, cli args) for every command, in an order that keeps the fixtures valid."""
+    zone = ctx["zone_id"]
+    return [
+        ("list-s3", ["list-s3"]),
+        ("list-s3 --use_tagging_api", ["list-s3", "--use_tagging_api"]),
+        ("list-s3-files", ["list-s3-files", "--bucket_name", OBJECTS_BUCKET]),
+        ("s3-du", ["s3-du", "--bucket_name", OBJECTS_BUCKET, "--depth", "2"]),
+        ("upload-s3", ["upload-s3", "--bucket_name", OBJECTS_BUCKET, "--file_path", ctx["upload_file"]]),
+        ("s3-sync", ["s3-sync", "--bucket_name", OBJECTS_BUCKET, "--local_dir", ctx["sync_dir"], "--prefix", "sync/"]),
+        ("s3-sync (unchanged)", ["s3-sync", "--bucket_name", OBJECTS_BUCKET, "--local_dir", ctx["sync_dir"],
+                                 "--prefix", "sync/"]),
+        ("download-s3", ["download-s3", "--bucket_name", OBJECTS_BUCKET, "--prefix", "sync/",
+                         "--dest", ctx["download_dir"]]),
+        ("download-s3 (unchanged)", ["download-s3", "--bucket_name", OBJECTS_BUCKET, "--prefix", "sync/",
+                                     "--dest", ctx["download_dir"]]),
+        ("delete-s3-files", ["delete-s3-files", "--bucket_name", OBJECTS_BUCKET, "--prefix", "sync/", "--yes"]),
+        ("create-s3", ["create-s3", "--bucket_name", f"bench-new-{size}"]),
+        ("delete-s3 --force", ["delete-s3", "--bucket_name", f"bench-new-{size}", "--force", "--yes"]),
+        ("list-route53", ["list-route53"]),
+        ("list-records-cli", ["list-records-cli", "--zone_id", zone]),
+        ("create-record-cli", ["create-record-cli", "--zone_id", zone, "--name", f"new.{RECORDS_ZONE}",
+                               "--type_", "A", "--value", "192.0.2.1"]),
+        ("update-record-cli", ["update-record-cli", "--zone_id", zone, "--name", f"new.{RECORDS_ZONE}",
+                               "--type_", "A", "--value", "192.0.2.2"]),
+        ("delete-record-cli", ["delete-record-cli", "--zone_id", zone, "--name", f"new.{RECORDS_ZONE}",
+                               "--type_", "A", "--value", "192.0.2.2"]),
+        ("route53-apply", ["route53-apply", "--zone_id", zone, "--record_file", ctx["record_file"]]),
+        ("route53-export", ["route53-export", "--zone_id", zone, "--zone_file", ctx["zone_file"]]),
+        ("route53-import", ["route53-import", "--zone_id", zone, "--zone_file", ctx["zone_file"]]),
+        ("create-route53", ["create-route53", "--zone_name", f"new-{size}.example.com"]),
+        ("list-ec2", ["list-ec2"]),
+        ("stop-ec2", ["stop-ec2", "--tag", "Environment=dev"]),
+        # Runs while the fleet is stopped, so the running-instance cap does not reject it
+        ("create-ec2", ["create-ec2", "--instance_type", "t3.micro", "--os_name", "amazon-linux"]),
+        ("start-ec2", ["start-ec2", "--tag", "Environment=dev"]),
+        ("inventory", ["inventory"]),
+        ("batch (20 commands)", ["batch", ctx["batch_file"]]),
+    ]
+
+
+def run_command(cli, args, track_memory):
+    """Run one CLI command in-process and return its metrics."""
+    global _api_calls
+    _api_calls = 0
+    if track_memory:
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+    error = None
+    sink = _Discard()
+    started = time.perf_counter()
+    with redirect_stdout(sink):
+        try:
+            code = cli.main(args=["--refresh", *args], prog_name="cli", standalone_mode=False)
+        except Exception as e:  # report, but keep benchmarking the other commands
+            error = repr(e)
+        else:
+            # Commands report their own errors and exit 1 instead of raising
+            if code or sink.first_error:
+                error = sink.first_error or f"exit status {code}"
+    elapsed = time.perf_counter() - started
+    peak_mb = (tracemalloc.get_traced_memory()[1] - before) / (1024 * 1024) if track_memory else None
+    return {"seconds": round(elapsed, 4), "api_calls": _api_calls,
+            "peak_mb": round(peak_mb, 3) if peak_mb is not None else None, "error": error}
+
+
+def compare(results, baseline, threshold):
+    """Return a list of regression messages."""
+    regressions = []
+    for key, current in results.items():
+        base = baseline.get(key)
+        if not base:
+            continue
+        checks = [("api_calls", 0), ("seconds", MIN_TIME_DELTA), ("peak_mb", MIN_MEMORY_DELTA_MB)]
+        for metric, min_delta in checks:
+            old, new = base.get(metric), current.get(metric)
+            if old is None or new is None:
+                continue
+            if new > old * (1 + threshold) and new - old > min_delta:
+                regressions.append(f"{key}: {metric} {old} -> {new}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Comma-separated fixture sizes")
+    parser.add_argument("--only", default="", help="Comma-separated command labels to run (default: all)")
+    parser.add_argument("--baseline", help="Baseline JSON to compare against")
+    parser.add_argument("--save_baseline", help="Write the results as a new baseline JSON")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Allowed relative growth")
+    parser.add_argument("--no_memory", action="store_true", help="Skip tracemalloc (faster, no peak_mb)")
+    parser.add_argument("--csv", help="Also write the results as CSV")
+    opts = parser.parse_args()
+
+    try:
+        from moto import mock_aws
+    except ImportError:
+        sys.exit('moto is required: pip install "moto[s3,ec2,route53,ssm,resourcegroupstaggingapi]"')
+
+    only = {c.strip() for c in opts.only.split(",") if c.strip()}
+    sizes = [int(s) for s in opts.sizes.split(",") if s.strip()]
+    results = {}
+
+    with tempfile.TemporaryDirectory() as workdir:
+        _isolate_environment(workdir)
+        _install_call_counter()
+        import utils
+        from cli import cli
+
+        # The stand-in never throttles, so client-side rate limiting would only add sleeps
+        utils.configure_rate_limits({service: 0 for service in utils.RATE_LIMITS})
+
+        if not opts.no_memory:
+            tracemalloc.start()
+        print(f"{'command':<28} {'size':>6} {'time (s)':>9} {'api calls':>10} {'peak MB':>9}")
+        for size in sizes:
+            with mock_aws():
+                utils.configure_clients()  # fresh clients inside each stand-in
+                ctx = build_fixtures(size, workdir)
+                for label, args in commands(size, ctx):
+                    if only and label not in only:
+                        continue
+                    metrics = run_command(cli, args, not opts.no_memory)
+                    results[f"{label}@{size}"] = metrics
+                    peak = f"{metrics['peak_mb']:.2f}" if metrics["peak_mb"] is not None else "-"
+                    note = f"  ERROR {metrics['error']}" if metrics["error"] else ""
+                    print(f"{label:<28} {size:>6} {metrics['seconds']:>9.3f} {metrics['api_calls']:>10} {peak:>9}{note}",
+                          flush=True)
+
+    if opts.csv:
+        with open(opts.csv, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["command", "size", "seconds", "api_calls", "peak_mb", "error"])
+            for key, m in results.items():
+                label, size = key.rsplit("@", 1)
+                writer.writerow([label, size, m["seconds"], m["api_calls"], m["peak_mb"], m["error"] or ""])
+
+    failed = [key for key, m in results.items() if m["error"]]
+    if failed:
+        print(f"FAIL: {len(failed)} command(s) reported an error: {', '.join(failed)}")
+        sys.exit(1)
+
+    if opts.save_baseline:
+        with open(opts.save_baseline, "w") as f:
+            json.dump(results, f, indent=1, sort_keys=True)
+        print(f"Saved baseline to {opts.save_baseline}")
+
+    if opts.baseline:
+        with open(opts.baseline) as f:
+            regressions = compare(results, json.load(f), opts.threshold)
+        if regressions:
+            print(f"FAIL: {len(regressions)} regression(s) past {opts.threshold:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("No regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
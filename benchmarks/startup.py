@@ -0,0 +1,86 @@
+"""
+Startup benchmark for the CLI.
+
+Runs `python -X importtime cli.py --help` to list the slowest imports, then
+times a number of plain `cli.py --help` runs. Exits with status 1 when the
+median wall-clock time exceeds the budget or when --help loads boto3/botocore.
+
+Usage:
+    python benchmarks/startup.py
+    python benchmarks/startup.py --runs 20 --budget_ms 200 --top 15
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLI = os.path.join(ROOT, "cli.py")
+
+# Modules that must never be imported just to print help
+FORBIDDEN_AT_STARTUP = ("boto3", "botocore", "s3transfer")
+
+DEFAULT_BUDGET_MS = 250
+
+
+def import_report(args):
+    """Return [(cumulative_us, module)] from a -X importtime run of the given CLI args."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", CLI, *args],
+        capture_output=True, text=True, cwd=ROOT,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self, cumulative, name = line[len("import time:"):].split("|")
+        # nested imports keep their extra indentation after the separator space
+        rows.append((int(cumulative), name[1:].rstrip()))
+    return rows
+
+
+def wall_clock_ms(args, runs):
+    """Return wall-clock times (ms) of `runs` fresh CLI processes."""
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, CLI, *args], capture_output=True, cwd=ROOT)
+        times.append((time.perf_counter() - started) * 1000)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=10, help="Timed runs of cli.py --help")
+    parser.add_argument("--budget_ms", type=float, default=DEFAULT_BUDGET_MS, help="Median wall-clock budget")
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to show")
+    opts = parser.parse_args()
+
+    rows = import_report(["--help"])
+    total_us = sum(cumulative for cumulative, name in rows if not name.startswith(" "))
+    print(f"Imports for `cli.py --help`: {len(rows)} modules, {total_us / 1000:.1f} ms")
+    for cumulative, name in sorted(rows, reverse=True)[:opts.top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name.strip()}")
+
+    failed = False
+    loaded = sorted({name.strip().split(".")[0] for _, name in rows} & set(FORBIDDEN_AT_STARTUP))
+    if loaded:
+        print(f"FAIL: --help imports {', '.join(loaded)}")
+        failed = True
+
+    times = wall_clock_ms(["--help"], opts.runs)
+    median = statistics.median(times)
+    print(f"cli.py --help: median {median:.1f} ms, min {min(times):.1f} ms, max {max(times):.1f} ms "
+          f"over {opts.runs} runs (budget {opts.budget_ms:.0f} ms)")
+    if median > opts.budget_ms:
+        print(f"FAIL: median startup {median:.1f} ms exceeds budget {opts.budget_ms:.0f} ms")
+        failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
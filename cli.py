@@ -1,39 +1,137 @@
 import click
-from ec2_manager import create_instance, start_instance, stop_instance, list_instances
-from s3_manager import create_bucket, list_buckets, upload_file, list_files
-from route53_manager import create_zone, list_zones, list_records, create_record, update_record, delete_record
+
+# Manager modules (and boto3 with them) are imported inside each command so
+# that --help and argument errors never pay for loading the AWS SDK.
+
+PROFILE = "duvie-platform-cli"
+
+def _parse_rate_limits(values):
+    """Turn SERVICE=RPS option values into a dict."""
+    limits = {}
+    for value in values:
+        service, sep, rate = value.partition("=")
+        try:
+            limits[service] = float(rate)
+        except ValueError:
+            sep = ""
+        if not sep or not service:
+            raise click.BadParameter(f"expected SERVICE=RPS, got {value!r}", param_hint="--rate_limit")
+        if not limits[service] >= 0:
+            raise click.BadParameter(f"rate must be 0 (off) or positive, got {value!r}", param_hint="--rate_limit")
+    return limits
 
 @click.group()
-def cli():
+@click.option("--refresh", is_flag=True, help="Re-check resource ownership with AWS instead of the local cache")
+@click.option("--profile_api", is_flag=True, help="Report per-operation AWS call counts and latency at exit")
+@click.option("--profile_api_format", type=click.Choice(["text", "json"]), default="text",
+              help="Format of the --profile_api report (written to stderr)")
+@click.option("--rate_limit", "rate_limits", multiple=True,
+              help="Client-side requests/second per service, e.g. route53=5 (repeatable, 0 disables)")
+@click.option("--max_attempts", default=None, type=click.IntRange(1), help="AWS call attempts including retries")
+@click.option("--retry_mode", default=None, type=click.Choice(["adaptive", "standard", "legacy"]),
+              help="botocore retry mode (default: adaptive)")
+@click.option("--output", "output_format", type=click.Choice(["table", "jsonl", "csv"]), default="table",
+              help="Format of list command results")
+@click.pass_context
+def cli(ctx, refresh, profile_api, profile_api_format, rate_limits, max_attempts, retry_mode, output_format):
     """Platform CLI - Self Service AWS Management"""
+    import output
+    import resource_cache
+    output.set_format(output_format)
+    output.reset_failed()
+    resource_cache.set_refresh(refresh)
+    if rate_limits:
+        import utils
+        utils.configure_rate_limits(_parse_rate_limits(rate_limits))
+    if max_attempts or retry_mode:
+        import utils
+        settings = {"max_attempts": max_attempts, "retry_mode": retry_mode}
+        utils.configure_clients(**{k: v for k, v in settings.items() if v is not None})
+    if profile_api:
+        import api_trace
+        api_trace.enable()
+        ctx.call_on_close(lambda: api_trace.report(profile_api_format))
+
+@cli.result_callback()
+@click.pass_context
+def exit_status(ctx, result, **params):
+    """Exit with status 1 when the command reported an error."""
+    import output
+    if output.failed():
+        ctx.exit(1)
+
 # EC2
 @cli.command()
 @click.option("--instance_type", default="t2.micro", help="EC2 instance type (t3.micro or t2.small only)")
 @click.option("--os_name", default="ubuntu", help="OS: ubuntu or amazon-linux")
+@click.option("--count", default=1, type=click.IntRange(1), help="Number of instances to launch")
 @click.option("--region", default="us-east-1", help="AWS region")
-def create_ec2(instance_type, os_name, region):
-    """Create an EC2 instance"""
-    create_instance(instance_type, os_name, profile="duvie-platform-cli", region=region)
+def create_ec2(instance_type, os_name, count, region):
+    """Create EC2 instances"""
+    from ec2_manager import create_instance
+    create_instance(instance_type, os_name, profile=PROFILE, region=region, count=count)
+
+def _parse_tags(tags):
+    """Turn KEY=VALUE option values into a dict."""
+    parsed = {}
+    for tag in tags:
+        key, sep, value = tag.partition("=")
+        if not sep or not key:
+            raise click.BadParameter(f"expected KEY=VALUE, got {tag!r}", param_hint="--tag")
+        parsed[key] = value
+    return parsed
+
+def _instance_selection(instance_ids, tags, states):
+    """Prompt for an instance ID when neither IDs nor a selector were given."""
+    if not instance_ids and not tags and not states:
+        instance_ids = (click.prompt("Instance id"),)
+    return list(instance_ids), _parse_tags(tags), list(states)
 
 @cli.command()
-@click.option("--instance_id", prompt=True, help="ID of the instance to start")
+@click.option("--instance_id", "instance_ids", multiple=True, help="ID of an instance to start (repeatable)")
+@click.option("--tag", "tags", multiple=True, help="Select instances by tag KEY=VALUE (repeatable)")
+@click.option("--state", "states", multiple=True, help="Select instances in this state, e.g. stopped (repeatable)")
+@click.option("--wait", is_flag=True, help="Wait until every instance is running")
+@click.option("--timeout", default=600, help="Seconds to wait with --wait")
 @click.option("--region", default="us-east-1", help="AWS region")
-def start_ec2(instance_id, region):
-    """Start a CLI-created EC2 instance"""
-    start_instance(instance_id, profile="duvie-platform-cli", region=region)
+def start_ec2(instance_ids, tags, states, wait, timeout, region):
+    """Start CLI-created EC2 instances"""
+    from ec2_manager import start_instances
+    instance_ids, tag_filters, states = _instance_selection(instance_ids, tags, states)
+    start_instances(instance_ids, profile=PROFILE, region=region, tag_filters=tag_filters, states=states,
+                    wait=wait, timeout=timeout)
 
 @cli.command()
-@click.option("--instance_id", prompt=True, help="ID of the instance to stop")
+@click.option("--instance_id", "instance_ids", multiple=True, help="ID of an instance to stop (repeatable)")
+@click.option("--tag", "tags", multiple=True, help="Select instances by tag KEY=VALUE (repeatable)")
+@click.option("--state", "states", multiple=True, help="Select instances in this state, e.g. running (repeatable)")
+@click.option("--wait", is_flag=True, help="Wait until every instance is stopped")
+@click.option("--timeout", default=600, help="Seconds to wait with --wait")
 @click.option("--region", default="us-east-1", help="AWS region")
-def stop_ec2(instance_id, region):
-    """Stop a CLI-created EC2 instance"""
-    stop_instance(instance_id, profile="duvie-platform-cli", region=region)
+def stop_ec2(instance_ids, tags, states, wait, timeout, region):
+    """Stop CLI-created EC2 instances"""
+    from ec2_manager import stop_instances
+    instance_ids, tag_filters, states = _instance_selection(instance_ids, tags, states)
+    stop_instances(instance_ids, profile=PROFILE, region=region, tag_filters=tag_filters, states=states,
+                   wait=wait, timeout=timeout)
 
 @cli.command()
-@click.option("--region", default="us-east-1", help="AWS region")
-def list_ec2(region):
+@click.option("--region", default="us-east-1", help="AWS region, or 'all' for every enabled region")
+@click.option("--profile", "profiles", multiple=True, default=[PROFILE], show_default=True,
+              help="AWS profile (repeat for several)")
+@click.option("--concurrency", default=17, type=click.IntRange(1, 64), help="Regions/profiles queried in parallel")
+@click.option("--watch", is_flag=True, help="Keep polling and print state changes only (Ctrl+C to stop)")
+@click.option("--interval", default=2.0, type=click.FloatRange(0.5), help="Poll interval in seconds while instances change state")
+@click.option("--max_interval", default=30.0, type=click.FloatRange(0.5), help="Longest poll interval while nothing changes")
+def list_ec2(region, profiles, concurrency, watch, interval, max_interval):
     """List CLI-created EC2 instances"""
-    list_instances(profile="duvie-platform-cli", region=region)
+    if watch:
+        from ec2_manager import watch_instances
+        watch_instances(profiles=list(profiles), region=region, concurrency=concurrency,
+                        fast_interval=interval, slow_interval=max(interval, max_interval))
+        return
+    from ec2_manager import list_instances
+    list_instances(profiles=list(profiles), region=region, concurrency=concurrency)
 
 # S3
 @cli.command()
@@ -42,29 +140,117 @@ def list_ec2(region):
 @click.option("--region", default="us-east-1", help="AWS region for the bucket")
 def create_s3(bucket_name, public, region):
     """Create an S3 bucket"""
-    create_bucket(bucket_name, public, profile="duvie-platform-cli", region=region)
+    from s3_manager import create_bucket
+    create_bucket(bucket_name, public, profile=PROFILE, region=region)
 
 @cli.command()
 @click.option("--region", default="us-east-1", help="AWS region")
-def list_s3(region):
+@click.option("--concurrency", default=16, type=click.IntRange(1, 256), help="Parallel bucket tag lookups")
+@click.option("--use_tagging_api", is_flag=True, help="Find tagged buckets with one Resource Groups Tagging API query (buckets in --region only)")
+def list_s3(region, concurrency, use_tagging_api):
     """List CLI-created S3 buckets"""
-    list_buckets(profile="duvie-platform-cli", region=region)
+    from s3_manager import list_buckets
+    list_buckets(profile=PROFILE, region=region, concurrency=concurrency, use_tagging_api=use_tagging_api)
 
 @cli.command()
 @click.option("--bucket_name", prompt=True, help="Target S3 bucket")
-@click.option("--file_path", prompt=True, help="Path to local file")
-@click.option("--object_name", default=None, help="S3 object name (optional)")
+@click.option("--file_path", prompt=True, help="Path to a local file, directory or glob (quote globs)")
+@click.option("--object_name", default=None, help="S3 object name, or key prefix for a directory/glob (optional)")
+@click.option("--workers", default=8, type=click.IntRange(1, 64), help="Files uploaded in parallel")
+@click.option("--chunk_size_mb", default=8, type=click.IntRange(5, 5120), help="Multipart chunk size in MB")
+@click.option("--max_concurrency", default=4, type=click.IntRange(1, 64), help="Parallel parts per file")
+@click.option("--region", default="us-east-1", help="AWS region")
+def upload_s3(bucket_name, file_path, object_name, workers, chunk_size_mb, max_concurrency, region):
+    """Upload files to a CLI-created S3 bucket"""
+    from s3_manager import upload_file
+    upload_file(bucket_name, file_path, profile=PROFILE, region=region, object_name=object_name,
+                workers=workers, chunk_size_mb=chunk_size_mb, max_concurrency=max_concurrency)
+
+@cli.command()
+@click.option("--bucket_name", prompt=True, help="CLI-created S3 bucket to download from")
+@click.option("--key", default=None, help="Object to download")
+@click.option("--prefix", default=None, help="Download every object under this prefix instead")
+@click.option("--dest", default=".", show_default=True,
+              help="Local file or directory (for --prefix, the directory that mirrors the prefix)")
+@click.option("--workers", default=8, type=click.IntRange(1, 64), help="Files downloaded in parallel")
+@click.option("--chunk_size_mb", default=8, type=click.IntRange(5, 5120), help="Ranged GET size in MB")
+@click.option("--max_concurrency", default=4, type=click.IntRange(1, 64), help="Parallel ranged GETs per file")
 @click.option("--region", default="us-east-1", help="AWS region")
-def upload_s3(bucket_name, file_path, object_name, region):
-    """Upload a file to a CLI-created S3 bucket"""
-    upload_file(bucket_name, file_path, profile="duvie-platform-cli", region=region, object_name=object_name)
+def download_s3(bucket_name, key, prefix, dest, workers, chunk_size_mb, max_concurrency, region):
+    """Download files from a CLI-created S3 bucket"""
+    if (key is None) == (prefix is None):
+        raise click.UsageError("give exactly one of --key or --prefix")
+    from s3_manager import download_files
+    download_files(bucket_name, profile=PROFILE, region=region, key=key, prefix=prefix or "", dest=dest,
+                   workers=workers, chunk_size_mb=chunk_size_mb, max_concurrency=max_concurrency)
+
+@cli.command()
+@click.option("--bucket_name", prompt=True, help="Target S3 bucket")
+@click.option("--local_dir", prompt=True, help="Local directory to sync")
+@click.option("--prefix", default="", help="Key prefix in the bucket")
+@click.option("--manifest", default=None, help="Manifest file (default: <local_dir>/.platform-cli-sync.json)")
+@click.option("--rehash", is_flag=True, help="Ignore the manifest and re-check every file")
+@click.option("--dry_run", is_flag=True, help="Only show what would be uploaded")
+@click.option("--workers", default=8, type=click.IntRange(1, 64), help="Files uploaded in parallel")
+@click.option("--chunk_size_mb", default=8, type=click.IntRange(5, 5120), help="Multipart chunk size in MB")
+@click.option("--max_concurrency", default=4, type=click.IntRange(1, 64), help="Parallel parts per file")
+@click.option("--region", default="us-east-1", help="AWS region")
+def s3_sync(bucket_name, local_dir, prefix, manifest, rehash, dry_run, workers, chunk_size_mb, max_concurrency, region):
+    """Upload only changed files to a CLI-created S3 bucket"""
+    from s3_manager import sync_directory
+    sync_directory(bucket_name, local_dir, profile=PROFILE, region=region, prefix=prefix,
+                   manifest_path=manifest, rehash=rehash, dry_run=dry_run, workers=workers,
+                   chunk_size_mb=chunk_size_mb, max_concurrency=max_concurrency)
 
 @cli.command()
 @click.option("--bucket_name", prompt=True, help="S3 bucket to list files from")
+@click.option("--prefix", default="", help="Only list keys starting with this prefix")
+@click.option("--delimiter", default="", help="Group keys by this delimiter (e.g. /)")
+@click.option("--max_keys", default=None, type=click.IntRange(1), help="Stop after this many keys")
 @click.option("--region", default="us-east-1", help="AWS region")
-def list_s3_files(bucket_name, region):
+def list_s3_files(bucket_name, prefix, delimiter, max_keys, region):
     """List files in a CLI-created S3 bucket"""
-    list_files(bucket_name, profile="duvie-platform-cli", region=region)
+    from s3_manager import list_files
+    list_files(bucket_name, profile=PROFILE, region=region,
+               prefix=prefix, delimiter=delimiter, max_keys=max_keys)
+
+@cli.command()
+@click.option("--bucket_name", prompt=True, help="CLI-created S3 bucket to analyze")
+@click.option("--prefix", default="", help="Only count keys under this prefix")
+@click.option("--depth", default=1, type=click.IntRange(1), help="Prefix levels to break down (/ separated)")
+@click.option("--top", default=20, type=click.IntRange(1), help="Show the N largest prefixes")
+@click.option("--workers", default=16, type=click.IntRange(1, 64), help="Top-level prefixes listed in parallel")
+@click.option("--region", default="us-east-1", help="AWS region")
+def s3_du(bucket_name, prefix, depth, top, workers, region):
+    """Show storage used per prefix in a CLI-created S3 bucket"""
+    from s3_manager import disk_usage
+    disk_usage(bucket_name, profile=PROFILE, region=region, prefix=prefix, depth=depth, top=top, workers=workers)
+
+@cli.command()
+@click.option("--bucket_name", prompt=True, help="CLI-created S3 bucket")
+@click.option("--prefix", prompt=True, help="Delete every object whose key starts with this prefix")
+@click.option("--all_versions", is_flag=True, help="Also delete old versions and delete markers (permanent)")
+@click.option("--yes", "assume_yes", is_flag=True, help="Do not ask for confirmation")
+@click.option("--workers", default=8, type=click.IntRange(1, 64), help="delete_objects calls in parallel")
+@click.option("--region", default="us-east-1", help="AWS region")
+def delete_s3_files(bucket_name, prefix, all_versions, assume_yes, workers, region):
+    """Delete files under a prefix in a CLI-created S3 bucket"""
+    if not prefix:
+        raise click.BadParameter("must not be empty (use delete-s3 --force to empty a bucket)", param_hint="--prefix")
+    from s3_manager import delete_files
+    delete_files(bucket_name, prefix, profile=PROFILE, region=region, all_versions=all_versions,
+                 assume_yes=assume_yes, workers=workers)
+
+@cli.command()
+@click.option("--bucket_name", prompt=True, help="CLI-created S3 bucket to delete")
+@click.option("--force", is_flag=True, help="Delete all objects, versions and unfinished uploads first")
+@click.option("--yes", "assume_yes", is_flag=True, help="Do not ask for confirmation")
+@click.option("--workers", default=8, type=click.IntRange(1, 64), help="delete_objects calls in parallel")
+@click.option("--region", default="us-east-1", help="AWS region")
+def delete_s3(bucket_name, force, assume_yes, workers, region):
+    """Delete a CLI-created S3 bucket"""
+    from s3_manager import delete_bucket
+    delete_bucket(bucket_name, profile=PROFILE, region=region, force=force, assume_yes=assume_yes, workers=workers)
 
 # Route53
 @cli.command()
@@ -72,20 +258,23 @@ def list_s3_files(bucket_name, region):
 @click.option("--region", default="us-east-1", help="AWS region")
 def create_route53(zone_name, region):
     """Create a Route53 DNS zone"""
-    create_zone(zone_name, profile="duvie-platform-cli", region=region)
+    from route53_manager import create_zone
+    create_zone(zone_name, profile=PROFILE, region=region)
 
 @cli.command()
 @click.option("--region", default="us-east-1", help="AWS region")
 def list_route53(region):
     """List CLI-created Route53 DNS zones"""
-    list_zones(profile="duvie-platform-cli", region=region)
+    from route53_manager import list_zones
+    list_zones(profile=PROFILE, region=region)
 
 # Route53 Records
 @cli.command()
 @click.option("--zone_id", prompt=True, help="Hosted zone ID")
 def list_records_cli(zone_id):
     """List records in a CLI-created zone"""
-    list_records(zone_id, profile="duvie-platform-cli", region="us-east-1")
+    from route53_manager import list_records
+    list_records(zone_id, profile=PROFILE, region="us-east-1")
 
 @cli.command()
 @click.option("--zone_id", prompt=True, help="Hosted zone ID")
@@ -95,7 +284,8 @@ def list_records_cli(zone_id):
 @click.option("--ttl", default=300, help="Record TTL")
 def create_record_cli(zone_id, name, type_, value, ttl):
     """Create a record in a CLI-managed zone"""
-    create_record(zone_id, name, type_, value, ttl, profile="duvie-platform-cli", region="us-east-1")
+    from route53_manager import create_record
+    create_record(zone_id, name, type_, value, ttl, profile=PROFILE, region="us-east-1")
 
 @cli.command()
 @click.option("--zone_id", prompt=True, help="Hosted zone ID")
@@ -105,7 +295,8 @@ def create_record_cli(zone_id, name, type_, value, ttl):
 @click.option("--ttl", default=300, help="Record TTL")
 def update_record_cli(zone_id, name, type_, value, ttl):
     """Update a record in a CLI-managed zone"""
-    update_record(zone_id, name, type_, value, ttl, profile="duvie-platform-cli", region="us-east-1")
+    from route53_manager import update_record
+    update_record(zone_id, name, type_, value, ttl, profile=PROFILE, region="us-east-1")
 
 @cli.command()
 @click.option("--zone_id", prompt=True, help="Hosted zone ID")
@@ -114,7 +305,140 @@ def update_record_cli(zone_id, name, type_, value, ttl):
 @click.option("--value", prompt=True, help="Record value")
 def delete_record_cli(zone_id, name, type_, value):
     """Delete a record in a CLI-managed zone"""
-    delete_record(zone_id, name, type_, value, profile="duvie-platform-cli", region="us-east-1")
+    from route53_manager import delete_record
+    delete_record(zone_id, name, type_, value, profile=PROFILE, region="us-east-1")
+
+@cli.command()
+@click.option("--zone_id", prompt=True, help="Hosted zone ID")
+@click.option("--record_file", prompt=True, type=click.Path(exists=True, dir_okay=False),
+              help="Desired record sets (.yaml, .json or .csv)")
+@click.option("--prune", is_flag=True, help="Delete records that are not in the file (apex SOA/NS are kept)")
+@click.option("--dry_run", is_flag=True, help="Only print the plan")
+def route53_apply(zone_id, record_file, prune, dry_run):
+    """Make a CLI-managed zone match a record file"""
+    from route53_manager import apply_records
+    apply_records(zone_id, record_file, profile=PROFILE, region="us-east-1", prune=prune, dry_run=dry_run)
+
+@cli.command()
+@click.option("--zone_id", prompt=True, help="Hosted zone ID")
+@click.option("--zone_file", default="-", show_default=True, help="Zone file to write ('-' for stdout)")
+def route53_export(zone_id, zone_file):
+    """Export a CLI-managed zone as a BIND zone file"""
+    from route53_manager import export_zone
+    export_zone(zone_id, zone_file, profile=PROFILE, region="us-east-1")
+
+@cli.command()
+@click.option("--zone_id", prompt=True, help="Hosted zone ID")
+@click.option("--zone_file", prompt=True, type=click.Path(exists=True, dir_okay=False), help="BIND zone file to import")
+@click.option("--dry_run", is_flag=True, help="Only show the record sets that would be imported")
+def route53_import(zone_id, zone_file, dry_run):
+    """Import a BIND zone file into a CLI-managed zone"""
+    from route53_manager import import_zone
+    import_zone(zone_id, zone_file, profile=PROFILE, region="us-east-1", dry_run=dry_run)
+
+# Inventory
+@cli.command()
+@click.option("--region", default="us-east-1", help="AWS region, or 'all' for every enabled region")
+@click.option("--profile", "profiles", multiple=True, default=[PROFILE], show_default=True,
+              help="AWS profile (repeat for several)")
+@click.option("--concurrency", default=16, type=click.IntRange(1, 64), help="Regions/profiles queried in parallel")
+def inventory(region, profiles, concurrency):
+    """List every CLI-created EC2 instance, S3 bucket and Route53 zone"""
+    from inventory import inventory as show_inventory
+    show_inventory(profiles=list(profiles), region=region, concurrency=concurrency)
+
+# Shell / batch
+# Group options that carry over from `cli.py [options] shell|batch` to every
+# command run inside it (a command line may still override them).
+INHERITED_OPTIONS = ("refresh", "output_format")
+
+def _run_line(ctx, line):
+    """Run one command line in this process; return False if it failed."""
+    import shlex
+    try:
+        args = shlex.split(line, comments=True)
+    except ValueError as e:
+        click.echo(f"Error: {e}", err=True)
+        return False
+    if not args:
+        return True
+    if args[0] == "shell":
+        click.echo("Error: already in a shell.", err=True)
+        return False
+
+    import output
+    root = ctx.find_root()
+    defaults = {name: root.params[name] for name in INHERITED_OPTIONS}
+    try:
+        # AWS clients stay in the utils registry between lines, so each command
+        # reuses the same sessions, credentials and open HTTPS connections.
+        code = cli.main(args=args, prog_name=root.info_name, standalone_mode=False, default_map=defaults)
+    except click.ClickException as e:
+        e.show()
+        return False
+    except click.Abort:
+        click.echo("Aborted!", err=True)
+        return False
+    except Exception as e:  # keep the session alive whatever a command raises
+        click.echo(f"Error: {e}", err=True)
+        return False
+    finally:
+        # A failed line has already been counted; don't fail the shell/batch command itself
+        output.reset_failed()
+    return not code
+
+@cli.command()
+@click.pass_context
+def shell(ctx):
+    """Run commands interactively in one warm process"""
+    try:
+        import readline  # noqa: F401  (line editing and history for input())
+    except ImportError:
+        pass
+    click.echo("Platform CLI shell. Type 'help' for commands, 'exit' or Ctrl+D to quit.")
+    while True:
+        try:
+            line = input("platform-cli> ").strip()
+        except EOFError:
+            click.echo()
+            return
+        except KeyboardInterrupt:
+            click.echo()
+            continue
+        if line in ("exit", "quit"):
+            return
+        if line == "help":
+            line = "--help"
+        try:
+            _run_line(ctx, line)
+        except KeyboardInterrupt:
+            click.echo("Interrupted.", err=True)
+
+@cli.command()
+@click.argument("script", type=click.File("r"))
+@click.option("--keep_going", is_flag=True, help="Continue after a command fails")
+@click.option("--echo", is_flag=True, help="Print each command before running it")
+@click.pass_context
+def batch(ctx, script, keep_going, echo):
+    """Run a file of commands (one per line, # comments) in one warm process"""
+    import time
+    start = time.perf_counter()
+    ran = failed = 0
+    for number, line in enumerate(script, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if echo:
+            click.echo(f"> {line}", err=True)
+        ran += 1
+        if not _run_line(ctx, line):
+            failed += 1
+            if not keep_going:
+                click.echo(f"Error: stopped at line {number} of {script.name}.", err=True)
+                break
+    click.echo(f"Ran {ran} commands in {time.perf_counter() - start:.2f} s ({failed} failed).", err=True)
+    if failed:
+        ctx.exit(1)
 
 if __name__ == "__main__":
     cli()
@@ -1,149 +1,395 @@
 from botocore.exceptions import ClientError, BotoCoreError
-from utils import default_tags, make_session
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterator, List, Tuple
+import json
+import os
+import random
+import time
+from utils import cache_dir, chunks, default_tags, get_client, has_default_tags, resolve_targets
+import output
+import resource_cache
 
 
 ALLOWED_INSTANCE_TYPES = {"t3.micro", "t2.small"}
 MAX_RUNNING = 2
 
+# Regions/profiles queried in parallel by list_instances
+DEFAULT_CONCURRENCY = 17
+
+# Bulk start/stop batching and --wait polling
+STATE_CHANGE_BATCH_SIZE = 50
+FILTER_VALUE_LIMIT = 200
+STATUS_BATCH_SIZE = 100
+WAIT_INITIAL_DELAY = 2.0
+WAIT_MAX_DELAY = 30.0
+DEFAULT_WAIT_TIMEOUT = 600
+
+# list-ec2 --watch polling
+TRANSITIONAL_STATES = {"pending", "stopping", "shutting-down", "rebooting"}
+WATCH_FAST_INTERVAL = 2.0
+WATCH_SLOW_INTERVAL = 30.0
+
+CLI_FILTERS = [
+    {"Name": "tag:CreatedBy", "Values": ["platform-cli"]},
+    {"Name": "tag:Owner", "Values": ["duvie"]},
+]
+
 AMI_MAP = {
     "ubuntu": "/aws/service/canonical/ubuntu/server/22.04/stable/current/amd64/hvm/ebs-gp2/ami-id",
     "amazon-linux": "/aws/service/ami-amazon-linux-latest/al2023-ami-kernel-6.1-x86_64"
 }
 
-def _latest_ami(os_name: str, session):
+# Resolved AMI IDs per region, cached on disk
+AMI_CACHE_NAME = "ami-cache.json"
+AMI_CACHE_TTL = 6 * 3600
+
+def _ami_cache_path() -> str:
+    return os.path.join(cache_dir(), AMI_CACHE_NAME)
+
+def _load_ami_cache() -> Dict[str, Dict]:
+    try:
+        with open(_ami_cache_path()) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _latest_amis(ssm, region: str) -> Dict[str, str]:
+    """
+    Return the latest AMI ID for every AMI_MAP entry in this region.
+    All SSM public parameters are fetched with one get_parameters call and
+    kept in a small on-disk cache for AMI_CACHE_TTL seconds.
+    """
+    cache = _load_ami_cache()
+    entry = cache.get(region)
+    if (entry and not resource_cache.refreshing() and time.time() - entry["fetched_at"] < AMI_CACHE_TTL
+            and set(entry["amis"]) == set(AMI_MAP)):
+        return entry["amis"]
+
+    resp = ssm.get_parameters(Names=list(AMI_MAP.values()))
+    by_param = {p["Name"]: p["Value"] for p in resp.get("Parameters", [])}
+    amis = {os_key: by_param[param] for os_key, param in AMI_MAP.items() if param in by_param}
+
+    cache[region] = {"fetched_at": time.time(), "amis": amis}
+    try:
+        with open(_ami_cache_path(), "w") as f:
+            json.dump(cache, f)
+    except OSError:
+        pass
+    return amis
+
+def _latest_ami(os_name: str, ssm, region: str):
     """
     Return the latest AMI ID for the chosen OS using SSM public parameters.
     Os_name: 'ubuntu' or 'amazon-linux'
     """
-    ssm = session.client("ssm")
     os_key = os_name.strip().lower()
 
     if os_key not in AMI_MAP:
         raise ValueError("Invalid OS. Use 'ubuntu' or 'amazon-linux'.")
 
-    param = AMI_MAP[os_key]
-    resp = ssm.get_parameter(Name=param)
-    return resp["Parameter"]["Value"]
+    amis = _latest_amis(ssm, region)
+    if os_key not in amis:
+        raise ValueError(f"SSM parameter {AMI_MAP[os_key]} not found in {region}.")
+    return amis[os_key]
 
-def _count_running_cli_instances(session) -> int:
-    ec2 = session.client("ec2")
-    filters = [
-        {"Name": "tag:CreatedBy", "Values": ["platform-cli"]},
-        {"Name": "tag:Owner", "Values": ["duvie"]},
-        {"Name": "instance-state-name", "Values": ["running"]},
-    ]
-    resp = ec2.describe_instances(Filters=filters)
-    return sum(len(r["Instances"]) for r in resp.get("Reservations", []))
+def _count_running_cli_instances(ec2) -> int:
+    filters = [{"Name": "instance-state-name", "Values": ["running"]}]
+    return sum(1 for _ in iter_cli_instances(ec2, filters))
 
-def create_instance(instance_type: str, os_name: str, profile: str, region: str):
+def create_instance(instance_type: str, os_name: str, profile: str, region: str, count: int = 1):
     """
-    Create an EC2 instance following exercise rules:
+    Create EC2 instances following exercise rules:
     - Allowed instance types: t3.micro, t2.small
-    - Hard cap of 2 running CLI-created instances
+    - Hard cap of 2 running CLI-created instances (checked once for the whole fleet)
     - AMI: latest Ubuntu or Amazon Linux
     - Tags: CreatedBy=platform-cli, Owner=duvie
+    All `count` instances are launched with a single run_instances call.
     """
     if instance_type not in ALLOWED_INSTANCE_TYPES:
-        print("Error: instance type must be 't3.micro' or 't2.small'.")
+        output.error("Error: instance type must be 't3.micro' or 't2.small'.")
         return
 
-    session = make_session(profile, region)
+    ec2 = get_client("ec2", profile, region)
 
-    running = _count_running_cli_instances(session)
+    try:
+        running = _count_running_cli_instances(ec2)
+    except (ClientError, BotoCoreError) as e:
+        output.error(f"Error: could not count running instances ({e}).")
+        return
     if running >= MAX_RUNNING:
-        print("Error: cap reached. You already have 2 running instances created by this CLI.")
+        output.error(f"Error: cap reached. You already have {MAX_RUNNING} running instances created by this CLI.")
+        return
+    if running + count > MAX_RUNNING:
+        output.error(f"Error: launching {count} instances would exceed the cap of {MAX_RUNNING} "
+                     f"({running} already running).")
         return
 
     try:
-        ami_id = _latest_ami(os_name, session)
+        ami_id = _latest_ami(os_name, get_client("ssm", profile, region), region)
     except (ClientError, BotoCoreError, ValueError) as e:
-        print(f"Error: could not resolve latest AMI ({e}).")
+        output.error(f"Error: could not resolve latest AMI ({e}).")
         return
 
-    ec2 = session.client("ec2")
     try:
         resp = ec2.run_instances(
             ImageId=ami_id,
             InstanceType=instance_type,
-            MinCount=1,
-            MaxCount=1,
+            MinCount=count,
+            MaxCount=count,
             TagSpecifications=[
                 {"ResourceType": "instance", "Tags": default_tags()}
             ],
         )
-        inst = resp["Instances"][0]
-        inst_id = inst["InstanceId"]
-        state = inst.get("State", {}).get("Name", "pending")
-        print(f"Success: created instance {inst_id} (state: {state}).")
+        for inst in resp["Instances"]:
+            inst_id = inst["InstanceId"]
+            state = inst.get("State", {}).get("Name", "pending")
+            resource_cache.remember("instance", profile, f"{region}/{inst_id}", default_tags())
+            print(f"Success: created instance {inst_id} (state: {state}).")
     except (ClientError, BotoCoreError) as e:
-        print(f"Error: failed to create instance ({e}).")
-
-def start_instance(instance_id: str, profile: str, region: str):
-    """Start a CLI-created EC2 instance."""
-    session = make_session(profile, region)
-    ec2 = session.client("ec2")
-
-    # Verify instance is CLI-created
-    filters = [
-        {"Name": "instance-id", "Values": [instance_id]},
-        {"Name": "tag:CreatedBy", "Values": ["platform-cli"]},
-        {"Name": "tag:Owner", "Values": ["duvie"]},
-    ]
-    resp = ec2.describe_instances(Filters=filters)
-    if not resp.get("Reservations"):
-        print(f"Error: instance {instance_id} not managed by this CLI.")
-        return
+        output.error(f"Error: failed to create instance ({e}).")
+
+def _select_cli_instances(ec2, profile: str, region: str, instance_ids: List[str],
+                          tag_filters: Dict[str, str], states: List[str]) -> List[str]:
+    """
+    Resolve instance IDs and/or a tag/state selector to CLI-created instance IDs.
+    Plain ID lists are answered from the local inventory cache where possible;
+    everything else is verified with one filtered describe_instances per chunk.
+    Prints an error for each requested ID that is not CLI-managed.
+    """
+    selector = [{"Name": f"tag:{k}", "Values": [v]} for k, v in tag_filters.items()]
+    if states:
+        selector.append({"Name": "instance-state-name", "Values": list(states)})
+
+    if not instance_ids:
+        found = []
+        for i in iter_cli_instances(ec2, selector):
+            resource_cache.remember("instance", profile, f"{region}/{i['InstanceId']}", i.get("Tags", []))
+            found.append(i["InstanceId"])
+        return sorted(found)
+
+    owned = set()
+    to_check = list(dict.fromkeys(instance_ids))
+    if not selector:
+        for instance_id in to_check:
+            tags = resource_cache.lookup("instance", profile, f"{region}/{instance_id}")
+            if tags is not None and has_default_tags(tags):
+                owned.add(instance_id)
+        to_check = [i for i in to_check if i not in owned]
+
+    for chunk in chunks(to_check, FILTER_VALUE_LIMIT):
+        for i in iter_cli_instances(ec2, [{"Name": "instance-id", "Values": chunk}] + selector):
+            resource_cache.remember("instance", profile, f"{region}/{i['InstanceId']}", i.get("Tags", []))
+            owned.add(i["InstanceId"])
+
+    for instance_id in instance_ids:
+        if instance_id not in owned:
+            output.error(f"Error: instance {instance_id} not managed by this CLI.")
+    return [i for i in dict.fromkeys(instance_ids) if i in owned]
+
+def _wait_for_state(ec2, instance_ids: List[str], target: str, timeout: int):
+    """
+    Poll describe_instance_status for all instances at once until each one
+    reaches `target`, backing off (with jitter) between rounds.
+    """
+    pending = set(instance_ids)
+    delay = WAIT_INITIAL_DELAY
+    deadline = time.monotonic() + timeout
+    while pending:
+        for chunk in chunks(sorted(pending), STATUS_BATCH_SIZE):
+            resp = ec2.describe_instance_status(InstanceIds=chunk, IncludeAllInstances=True)
+            for status in resp.get("InstanceStatuses", []):
+                if status["InstanceState"]["Name"] == target and status["InstanceId"] in pending:
+                    pending.discard(status["InstanceId"])
+                    print(f"Instance {status['InstanceId']} is {target}.", flush=True)
+        if not pending:
+            break
+        if time.monotonic() + delay > deadline:
+            output.error(f"Error: timed out waiting for {len(pending)} instance(s) to be {target}: "
+                         f"{', '.join(sorted(pending))}")
+            return
+        time.sleep(delay * random.uniform(0.8, 1.2))
+        delay = min(delay * 1.5, WAIT_MAX_DELAY)
+
+def _change_state(action: str, instance_ids: List[str], profile: str, region: str,
+                  tag_filters: Dict[str, str] = None, states: List[str] = None, wait: bool = False,
+                  timeout: int = DEFAULT_WAIT_TIMEOUT):
+    ec2 = get_client("ec2", profile, region)
+    verb, target = ("starting", "running") if action == "start" else ("stopping", "stopped")
 
+    # Verify instances are CLI-created
     try:
-        ec2.start_instances(InstanceIds=[instance_id])
-        print(f"Success: starting instance {instance_id}.")
+        targets = _select_cli_instances(ec2, profile, region, instance_ids or [], tag_filters or {}, states or [])
     except (ClientError, BotoCoreError) as e:
-        print(f"Error: failed to start instance ({e}).")
-
-def stop_instance(instance_id: str, profile: str, region: str):
-    """Stop a CLI-created EC2 instance."""
-    session = make_session(profile, region)
-    ec2 = session.client("ec2")
-
-    # Verify instance is CLI-created
-    filters = [
-        {"Name": "instance-id", "Values": [instance_id]},
-        {"Name": "tag:CreatedBy", "Values": ["platform-cli"]},
-        {"Name": "tag:Owner", "Values": ["duvie"]},
-    ]
-    resp = ec2.describe_instances(Filters=filters)
-    if not resp.get("Reservations"):
-        print(f"Error: instance {instance_id} not managed by this CLI.")
+        output.error(f"Error: could not look up instances ({e}).")
+        return
+    if not targets:
+        if not instance_ids:
+            print("No CLI-created instances match the selector.")
         return
 
-    try:
-        ec2.stop_instances(InstanceIds=[instance_id])
-        print(f"Success: stopping instance {instance_id}.")
-    except (ClientError, BotoCoreError) as e:
-        print(f"Error: failed to stop instance ({e}).")
+    call = ec2.start_instances if action == "start" else ec2.stop_instances
+    changed = []
+    for chunk in chunks(targets, STATE_CHANGE_BATCH_SIZE):
+        try:
+            call(InstanceIds=chunk)
+            changed.extend(chunk)
+            for instance_id in chunk:
+                print(f"Success: {verb} instance {instance_id}.")
+        except (ClientError, BotoCoreError) as e:
+            output.error(f"Error: failed to {action} instance(s) {', '.join(chunk)} ({e}).")
+
+    if wait and changed:
+        try:
+            _wait_for_state(ec2, changed, target, timeout)
+        except (ClientError, BotoCoreError) as e:
+            output.error(f"Error: could not check instance state ({e}).")
+
+def start_instances(instance_ids: List[str], profile: str, region: str, tag_filters: Dict[str, str] = None,
+                    states: List[str] = None, wait: bool = False, timeout: int = DEFAULT_WAIT_TIMEOUT):
+    """Start CLI-created EC2 instances, given by ID and/or a tag/state selector."""
+    _change_state("start", instance_ids, profile, region, tag_filters, states, wait, timeout)
 
-def list_instances(profile: str, region: str):
-    """List all EC2 instances created by this CLI."""
-    session = make_session(profile, region)
-    ec2 = session.client("ec2")
+def stop_instances(instance_ids: List[str], profile: str, region: str, tag_filters: Dict[str, str] = None,
+                   states: List[str] = None, wait: bool = False, timeout: int = DEFAULT_WAIT_TIMEOUT):
+    """Stop CLI-created EC2 instances, given by ID and/or a tag/state selector."""
+    _change_state("stop", instance_ids, profile, region, tag_filters, states, wait, timeout)
 
-    filters = [
-        {"Name": "tag:CreatedBy", "Values": ["platform-cli"]},
-        {"Name": "tag:Owner", "Values": ["duvie"]},
+def iter_cli_instances(ec2, filters=None) -> Iterator[Dict]:
+    """Yield every CLI-created instance, following describe_instances pagination."""
+    paginator = ec2.get_paginator("describe_instances")
+    for page in paginator.paginate(Filters=CLI_FILTERS + (filters or [])):
+        for r in page.get("Reservations", []):
+            yield from r["Instances"]
+
+def _instances_in(profile: str, region: str) -> List[Tuple[str, str, str, str, str]]:
+    ec2 = get_client("ec2", profile, region)
+    return [
+        (profile, region, i["InstanceId"], i.get("State", {}).get("Name", "unknown"), i.get("InstanceType", ""))
+        for i in iter_cli_instances(ec2)
     ]
 
-    resp = ec2.describe_instances(Filters=filters)
+def _collect_instances(targets: List[Tuple[str, str]], concurrency: int,
+                       on_rows: Callable[[List[Tuple[str, str, str, str, str]]], None] = None,
+                       failed: List[Tuple[str, str]] = None) -> List[Tuple[str, str, str, str, str]]:
+    """
+    Query every (profile, region) pair concurrently and return sorted instance rows.
+    on_rows, if given, is called with each pair's rows as soon as that pair completes;
+    pairs whose query failed are reported and appended to `failed`, if given.
+    """
     instances = []
-    for r in resp.get("Reservations", []):
-        for i in r["Instances"]:
-            inst_id = i["InstanceId"]
-            state = i.get("State", {}).get("Name", "unknown")
-            instances.append((inst_id, state))
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(targets)))) as pool:
+        futures = {pool.submit(_instances_in, profile, r): (profile, r) for profile, r in targets}
+        for future in as_completed(futures):
+            profile, r = futures[future]
+            try:
+                rows = future.result()
+            except (ClientError, BotoCoreError) as e:
+                output.error(f"Error: could not list instances in {r} for profile {profile} ({e}).")
+                if failed is not None:
+                    failed.append((profile, r))
+                continue
+            instances.extend(rows)
+            if on_rows:
+                on_rows(rows)
+    return sorted(instances)
+
+def list_instances(profiles: List[str], region: str, concurrency: int = DEFAULT_CONCURRENCY):
+    """
+    List all EC2 instances created by this CLI.
+    region may be 'all' to cover every enabled region; every (profile, region)
+    pair is queried concurrently and the results are merged into one table.
+    """
+    targets = resolve_targets(profiles, region)
+    if not targets:
+        return
 
+    if output.machine_readable():
+        # Stream each region's rows as it completes instead of waiting for the merged table.
+        writer = output.RecordWriter(["profile", "region", "instance_id", "state", "instance_type"])
+
+        def _write(rows):
+            for profile, r, inst_id, state, type_ in rows:
+                writer.write({"profile": profile, "region": r, "instance_id": inst_id,
+                              "state": state, "instance_type": type_}, "")
+
+        if not _collect_instances(targets, concurrency, on_rows=_write):
+            output.info("No instances created by this CLI.")
+        return
+
+    instances = _collect_instances(targets, concurrency)
     if not instances:
         print("No instances created by this CLI.")
         return
 
-    for inst_id, state in instances:
-        print(f"{inst_id} - {state}")
+    if len(targets) == 1:
+        for _profile, _region, inst_id, state, _type in instances:
+            print(f"{inst_id} - {state}")
+        return
+
+    show_profile = len(profiles) > 1
+    header = (["PROFILE"] if show_profile else []) + ["REGION", "INSTANCE ID", "STATE", "TYPE"]
+    rows = [([profile] if show_profile else []) + [r, inst_id, state, type_]
+            for profile, r, inst_id, state, type_ in instances]
+    widths = [max(len(str(row[i])) for row in [header] + rows) for i in range(len(header))]
+    for row in [header] + rows:
+        print("  ".join(str(col).ljust(w) for col, w in zip(row, widths)).rstrip())
+
+def watch_instances(profiles: List[str], region: str, concurrency: int = DEFAULT_CONCURRENCY,
+                    fast_interval: float = WATCH_FAST_INTERVAL, slow_interval: float = WATCH_SLOW_INTERVAL,
+                    max_polls: int = None):
+    """
+    Poll CLI-created instances and print only state changes, until Ctrl+C.
+    Polls every fast_interval seconds while any instance is in a transitional
+    state and doubles the interval up to slow_interval while all are stable.
+    """
+    targets = resolve_targets(profiles, region)
+    if not targets:
+        return
+
+    def _label(profile, r, inst_id):
+        if len(targets) == 1:
+            return inst_id
+        return f"{profile}/{r}/{inst_id}" if len(profiles) > 1 else f"{r}/{inst_id}"
+
+    writer = output.RecordWriter(["profile", "region", "instance_id", "previous_state", "state"])
+
+    def _emit(key, before, after):
+        profile, r, inst_id = key
+        line = f"{_label(*key)}: {after}" if before is None else f"{_label(*key)}: {before} → {after}"
+        writer.write({"profile": profile, "region": r, "instance_id": inst_id,
+                      "previous_state": before, "state": after}, line)
+
+    previous = None
+    interval = fast_interval
+    polls = 0
+    try:
+        while True:
+            failed = []
+            current = {(p, r, i): state
+                       for p, r, i, state, _type in _collect_instances(targets, concurrency, failed=failed)}
+            if previous and failed:
+                # A failed query says nothing about its instances: keep their last
+                # known states rather than reporting them gone (and new again later)
+                current.update({key: state for key, state in previous.items() if key[:2] in failed})
+            if previous is None:
+                if not current:
+                    output.info("No instances created by this CLI.")
+                for key, state in current.items():
+                    _emit(key, None, state)
+            else:
+                for key in sorted(set(previous) | set(current)):
+                    before, after = previous.get(key, "(new)"), current.get(key, "(gone)")
+                    if before != after:
+                        _emit(key, before, after)
+            previous = current
 
+            polls += 1
+            if max_polls is not None and polls >= max_polls:
+                return
+            if any(state in TRANSITIONAL_STATES for state in current.values()):
+                interval = fast_interval
+            else:
+                interval = min(interval * 2, slow_interval)
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,130 @@
+from botocore.exceptions import ClientError, BotoCoreError
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Tuple
+from ec2_manager import FILTER_VALUE_LIMIT, iter_cli_instances
+from utils import chunks, get_client, iter_tagged_resources, resolve_targets
+import output
+import resource_cache
+
+# Route53 is a global service; its tags are only served from us-east-1.
+GLOBAL_REGION = "us-east-1"
+REGIONAL_TYPES = ["ec2:instance", "s3"]
+GLOBAL_TYPES = ["route53:hostedzone"]
+FIELDS = ["profile", "service", "region", "id", "name", "state", "arn"]
+
+def _parse_arn(arn: str) -> Tuple[str, str]:
+    """Return (service, resource id) for an instance, bucket or hosted zone ARN."""
+    parts = arn.split(":", 5)
+    service, resource = parts[2], parts[5]
+    return service, resource.split("/")[-1]
+
+def _tagged_in(profile: str, region: str, resource_types: List[str]) -> List[Dict]:
+    """Return one inventory row per CLI-tagged resource in a region."""
+    rows = []
+    for mapping in iter_tagged_resources(profile, region, resource_types):
+        arn = mapping["ResourceARN"]
+        service, resource_id = _parse_arn(arn)
+        row = {"profile": profile, "service": service, "region": region, "id": resource_id,
+               "name": "", "state": "", "arn": arn}
+        if service == "ec2":
+            resource_cache.remember("instance", profile, f"{region}/{resource_id}", mapping.get("Tags", []))
+        elif service == "s3":
+            row["name"], row["state"] = resource_id, "available"
+            resource_cache.remember("bucket", profile, resource_id, mapping.get("Tags", []))
+        elif service == "route53":
+            row["region"] = "global"
+            resource_cache.remember("zone", profile, resource_id, mapping.get("Tags", []))
+        rows.append(row)
+    return rows
+
+def _instance_states(profile: str, region: str, instance_ids: List[str]) -> Dict[str, Tuple[str, str]]:
+    """Return {id: (state, name tag)} using a few batched describe_instances calls."""
+    ec2 = get_client("ec2", profile, region)
+    found = {}
+    for chunk in chunks(instance_ids, FILTER_VALUE_LIMIT):
+        for inst in iter_cli_instances(ec2, [{"Name": "instance-id", "Values": chunk}]):
+            name = next((t["Value"] for t in inst.get("Tags", []) if t["Key"] == "Name"), "")
+            found[inst["InstanceId"]] = (inst.get("State", {}).get("Name", "unknown"), name)
+    return found
+
+def _zone_names(profile: str) -> Dict[str, str]:
+    """Return {zone id: zone name} from the list_hosted_zones paginator (100 zones per call)."""
+    r53 = get_client("route53", profile, GLOBAL_REGION)
+    names = {}
+    for page in r53.get_paginator("list_hosted_zones").paginate():
+        for zone in page.get("HostedZones", []):
+            names[zone["Id"].split("/")[-1]] = zone["Name"]
+    return names
+
+def _enrich(rows: List[Dict], pool: ThreadPoolExecutor):
+    """Fill in EC2 state and Route53 zone names with batched calls, one task per profile/region."""
+    by_region, zone_profiles = {}, set()
+    for row in rows:
+        if row["service"] == "ec2":
+            by_region.setdefault((row["profile"], row["region"]), []).append(row)
+        elif row["service"] == "route53":
+            zone_profiles.add(row["profile"])
+
+    futures = {pool.submit(_instance_states, p, r, [row["id"] for row in group]): ("ec2", group)
+               for (p, r), group in by_region.items()}
+    futures.update({pool.submit(_zone_names, p): ("route53", [row for row in rows if row["service"] == "route53"
+                                                           and row["profile"] == p])
+                    for p in zone_profiles})
+    for future in as_completed(futures):
+        service, group = futures[future]
+        try:
+            result = future.result()
+        except (ClientError, BotoCoreError) as e:
+            output.error(f"Error: could not look up {service} details ({e}).")
+            continue
+        for row in group:
+            if service == "ec2":
+                # The tagging API can still report instances that were terminated a while ago
+                row["state"], row["name"] = result.get(row["id"], ("unknown", ""))
+            else:
+                row["name"], row["state"] = result.get(row["id"], ""), "available"
+
+def inventory(profiles: List[str], region: str, concurrency: int = 16):
+    """
+    Show every CLI-tagged EC2 instance, S3 bucket and Route53 zone.
+    Each (profile, region) is queried through the Resource Groups Tagging API
+    concurrently; instance states and zone names are then added with batched calls.
+    """
+    targets = resolve_targets(profiles, region)
+    if not targets:
+        return
+
+    tasks = [(p, r, REGIONAL_TYPES) for p, r in targets]
+    tasks += [(p, GLOBAL_REGION, GLOBAL_TYPES) for p in dict.fromkeys(p for p, _r in targets)]
+    found = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(tasks)))) as pool:
+        futures = {pool.submit(_tagged_in, p, r, types): (p, r) for p, r, types in tasks}
+        for future in as_completed(futures):
+            p, r = futures[future]
+            try:
+                # Bucket ARNs carry no region, so the same bucket may be reported by several regions
+                for row in future.result():
+                    found.setdefault((row["profile"], row["arn"]), row)
+            except (ClientError, BotoCoreError) as e:
+                output.error(f"Error: could not list tagged resources in {r} for profile {p} ({e}).")
+        rows = list(found.values())
+        _enrich(rows, pool)
+
+    if not rows:
+        output.info("No resources created by this CLI.")
+        return
+
+    rows.sort(key=lambda row: (row["profile"], row["service"], row["region"], row["name"] or row["id"]))
+    show_profile = len(profiles) > 1
+    columns = (["profile"] if show_profile else []) + ["service", "region", "id", "name", "state"]
+    widths = {c: max(len(c), *(len(str(row[c])) for row in rows)) for c in columns}
+    if not output.machine_readable():
+        print("  ".join(c.upper().ljust(widths[c]) for c in columns).rstrip())
+    writer = output.RecordWriter(FIELDS)
+    for row in rows:
+        writer.write(row, "  ".join(str(row[c]).ljust(widths[c]) for c in columns).rstrip())
+
+    counts = {}
+    for row in rows:
+        counts[row["service"]] = counts.get(row["service"], 0) + 1
+    output.info(f"{len(rows)} resources (" + ", ".join(f"{n} {s}" for s, n in sorted(counts.items())) + ").")
@@ -0,0 +1,102 @@
+"""
+Record output for the list commands.
+
+`table` keeps the human-readable lines, `jsonl` writes one JSON object per
+record and `csv` writes a header followed by one row per record. Records are
+written and flushed one at a time as they are produced, so piping a large
+listing into jq or a script starts immediately and uses constant memory.
+In the machine-readable formats, informational messages go to stderr.
+Errors are reported with `error`, which also records that the command
+failed so the CLI can exit non-zero.
+"""
+import csv
+import datetime
+import json
+import sys
+import threading
+from typing import Dict, List
+
+FORMATS = ("table", "jsonl", "csv")
+
+_format = "table"
+_lock = threading.Lock()
+_failed = False
+
+
+def set_format(fmt: str):
+    """Select the output format for this run."""
+    global _format
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown output format {fmt!r}; use one of {', '.join(FORMATS)}")
+    _format = fmt
+
+
+def machine_readable() -> bool:
+    return _format != "table"
+
+
+def info(message: str):
+    """Print a message that is not a record (headers, empty results, errors)."""
+    with _lock:
+        print(message, file=sys.stderr if machine_readable() else sys.stdout, flush=True)
+
+
+def error(message: str, file=None):
+    """Print an error like `info` (or to `file`) and mark the command as failed."""
+    global _failed
+    _failed = True
+    if file is None:
+        info(message)
+    else:
+        with _lock:
+            print(message, file=file, flush=True)
+
+
+def failed() -> bool:
+    """Return True if an error was reported since the last reset."""
+    return _failed
+
+
+def reset_failed():
+    global _failed
+    _failed = False
+
+
+class RecordWriter:
+    """Writes the records of one listing; safe to call from worker threads."""
+
+    def __init__(self, fields: List[str]):
+        self.fields = fields
+        self._csv = None
+
+    def write(self, record: Dict, line: str):
+        """Write one record; `line` is its human-readable form for the table format."""
+        with _lock:
+            if _format == "jsonl":
+                sys.stdout.write(json.dumps(record, default=_json_default) + "\n")
+            elif _format == "csv":
+                if self._csv is None:
+                    self._csv = csv.writer(sys.stdout)
+                    self._csv.writerow(self.fields)
+                self._csv.writerow([_csv_value(record.get(f)) for f in self.fields])
+            else:
+                sys.stdout.write(line + "\n")
+            sys.stdout.flush()
+
+
+def _json_default(value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    return str(value)
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        return " ".join(str(v) for v in value)
+    if isinstance(value, dict):
+        return " ".join(f"{k}={v}" for k, v in value.items())
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    return value
@@ -0,0 +1,113 @@
+"""
+Local inventory of CLI-managed resources and their tags.
+
+Ownership checks (bucket tags, zone tags, instance tags) are answered from a
+SQLite file in the user cache directory until the entry's TTL runs out.
+Create commands write through to it, and the global --refresh flag bypasses it.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from utils import cache_dir, has_default_tags
+
+# Seconds an entry is trusted, per resource kind
+TTL_SECONDS = {
+    "bucket": 24 * 3600,
+    "zone": 24 * 3600,
+    "instance": 3600,
+}
+
+DB_NAME = "inventory.sqlite3"
+
+_lock = threading.Lock()
+_conn = None
+_refresh = False
+
+
+def set_refresh(refresh: bool):
+    """When True, ignore cached entries (fresh lookups are still stored)."""
+    global _refresh
+    _refresh = refresh
+
+
+def refreshing() -> bool:
+    """Return True when cached data should be ignored for this run."""
+    return _refresh
+
+
+def _connect():
+    global _conn
+    if _conn is None:
+        _conn = sqlite3.connect(os.path.join(cache_dir(), DB_NAME), timeout=5, check_same_thread=False)
+        _conn.execute(
+            "CREATE TABLE IF NOT EXISTS resources ("
+            " kind TEXT NOT NULL, profile TEXT NOT NULL, resource_id TEXT NOT NULL,"
+            " tags TEXT NOT NULL, checked_at REAL NOT NULL,"
+            " PRIMARY KEY (kind, profile, resource_id))"
+        )
+    return _conn
+
+
+def lookup(kind: str, profile: str, resource_id: str) -> Optional[List[Dict[str, str]]]:
+    """Return the cached tags of a resource, or None if missing, expired or refreshing."""
+    if _refresh:
+        return None
+    try:
+        with _lock:
+            row = _connect().execute(
+                "SELECT tags, checked_at FROM resources WHERE kind = ? AND profile = ? AND resource_id = ?",
+                (kind, profile or "", resource_id),
+            ).fetchone()
+    except sqlite3.Error:
+        return None
+    if row is None or time.time() - row[1] > TTL_SECONDS.get(kind, 0):
+        return None
+    return json.loads(row[0])
+
+
+def remember(kind: str, profile: str, resource_id: str, tags: List[Dict[str, str]]):
+    """Store (or replace) the tags of a resource."""
+    try:
+        with _lock:
+            conn = _connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO resources (kind, profile, resource_id, tags, checked_at) VALUES (?, ?, ?, ?, ?)",
+                (kind, profile or "", resource_id, json.dumps(tags), time.time()),
+            )
+            conn.commit()
+    except sqlite3.Error:
+        pass
+
+
+def forget(kind: str, profile: str, resource_id: str):
+    """Drop a resource, e.g. after it has been deleted."""
+    try:
+        with _lock:
+            conn = _connect()
+            conn.execute(
+                "DELETE FROM resources WHERE kind = ? AND profile = ? AND resource_id = ?",
+                (kind, profile or "", resource_id),
+            )
+            conn.commit()
+    except sqlite3.Error:
+        pass
+
+
+def is_cli_managed(kind: str, profile: str, resource_id: str,
+                   fetch_tags: Callable[[], Optional[List[Dict[str, str]]]]) -> bool:
+    """
+    Return True if the resource carries the CLI default tags, asking AWS
+    through fetch_tags only on a cache miss. fetch_tags may return None when
+    the answer should not be cached (e.g. the resource was not found).
+    """
+    tags = lookup(kind, profile, resource_id)
+    if tags is None:
+        tags = fetch_tags()
+        if tags is None:
+            return False
+        remember(kind, profile, resource_id, tags)
+    return has_default_tags(tags)
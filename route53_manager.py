@@ -1,6 +1,28 @@
 import boto3
+import csv
+import json
+import os
+import sys
+import time
 from botocore.exceptions import ClientError, BotoCoreError
-from utils import default_tags, make_session
+from typing import Dict, Iterable, Iterator, List, Tuple
+from utils import default_tags, get_client, has_default_tags
+import output
+import resource_cache
+
+# list_tags_for_resources accepts at most 10 resource IDs per call
+TAG_BATCH_SIZE = 10
+
+# Page size for single-record lookups
+LOOKUP_PAGE_SIZE = 10
+
+# change_resource_record_sets limits per request (UPSERT values count twice)
+MAX_BATCH_RECORDS = 1000
+MAX_BATCH_CHARS = 32000
+
+# Routing fields that make two record sets with the same name/type different
+ROUTING_FIELDS = ("SetIdentifier", "Weight", "Region", "Failover", "MultiValueAnswer",
+                  "GeoLocation", "HealthCheckId", "AliasTarget")
 
 def get_resource_id(full_id: str) -> str:
     """Extract the actual resource ID from /hostedzone/..."""
@@ -9,8 +31,7 @@ def get_resource_id(full_id: str) -> str:
 # zone functions
 def create_zone(zone_name: str, profile: str, region: str):
     """Create a Route53 hosted zone."""
-    session = make_session(profile, region)
-    r53 = session.client("route53")
+    r53 = get_client("route53", profile, region)
 
     try:
         resp = r53.create_hosted_zone(
@@ -28,71 +49,127 @@ def create_zone(zone_name: str, profile: str, region: str):
             ResourceId=get_resource_id(resp['HostedZone']['Id']),
             AddTags=default_tags()
         )
+        resource_cache.remember("zone", profile, get_resource_id(resp['HostedZone']['Id']), default_tags())
 
         print(f"Success: created zone {zone_name} ({resp['HostedZone']['Id']})")
     except (ClientError, BotoCoreError) as e:
-        print(f"Error: failed to create zone ({e})")
+        output.error(f"Error: failed to create zone ({e})")
+
+def iter_cli_zones(r53, profile=None):
+    """
+    Yield CLI-created hosted zones, paging through list_hosted_zones and
+    resolving tags with list_tags_for_resources in batches of 10 zones.
+    """
+    paginator = r53.get_paginator("list_hosted_zones")
+    batch = []
+    for page in paginator.paginate():
+        for z in page.get("HostedZones", []):
+            batch.append(z)
+            if len(batch) == TAG_BATCH_SIZE:
+                yield from _filter_cli_zones(r53, batch, profile)
+                batch = []
+    if batch:
+        yield from _filter_cli_zones(r53, batch, profile)
+
+def _filter_cli_zones(r53, zones, profile=None):
+    """Return the zones from one batch (max 10) that carry the CLI tags, caching their tags."""
+    try:
+        tags_resp = r53.list_tags_for_resources(
+            ResourceType="hostedzone",
+            ResourceIds=[get_resource_id(z['Id']) for z in zones]
+        )
+    except ClientError as e:
+        if e.response['Error']['Code'] == "AccessDenied":
+            return []
+        raise
+    tagged = set()
+    for tag_set in tags_resp.get("ResourceTagSets", []):
+        resource_cache.remember("zone", profile, tag_set["ResourceId"], tag_set.get("Tags", []))
+        if has_default_tags(tag_set.get("Tags", [])):
+            tagged.add(tag_set["ResourceId"])
+    return [z for z in zones if get_resource_id(z['Id']) in tagged]
 
 def list_zones(profile: str, region: str):
     """List only CLI-created Route53 zones."""
-    session = make_session(profile, region)
-    r53 = session.client("route53")
+    r53 = get_client("route53", profile, region)
 
+    writer = output.RecordWriter(["name", "id", "record_count"])
     try:
-        resp = r53.list_hosted_zones()
-        zones = resp.get("HostedZones", [])
-        for z in zones:
-            try:
-                tags_resp = r53.list_tags_for_resource(
-                    ResourceType="hostedzone",
-                    ResourceId=get_resource_id(z['Id'])
-                )
-                tag_set = tags_resp.get("ResourceTagSet", {}).get("Tags", [])
-                if all(any(t['Key'] == d['Key'] and t['Value'] == d['Value'] for t in tag_set)
-                       for d in default_tags()):
-                    print(f"{z['Name']} - {z['Id']}")
-            except ClientError as e:
-                if e.response['Error']['Code'] == "AccessDenied":
-                    continue
-                else:
-                    raise
+        for z in iter_cli_zones(r53, profile):
+            record = {"name": z["Name"], "id": z["Id"], "record_count": z.get("ResourceRecordSetCount")}
+            writer.write(record, f"{z['Name']} - {z['Id']}")
     except (ClientError, BotoCoreError) as e:
-        print(f"Error: could not list zones ({e})")
+        output.error(f"Error: could not list zones ({e})")
 
 # record functions
-def is_cli_zone(r53, zone_id):
-    """Check if the hosted zone is CLI-created"""
-    try:
+def is_cli_zone(r53, zone_id, profile=None):
+    """Check if the hosted zone is CLI-created (answered from the local cache when possible)"""
+    def _fetch_tags():
         tags_resp = r53.list_tags_for_resource(ResourceType="hostedzone", ResourceId=get_resource_id(zone_id))
-        tag_set = tags_resp.get("ResourceTagSet", {}).get("Tags", [])
-        return all(any(t['Key'] == d['Key'] and t['Value'] == d['Value'] for t in tag_set)
-                   for d in default_tags())
+        return tags_resp.get("ResourceTagSet", {}).get("Tags", [])
+
+    try:
+        return resource_cache.is_cli_managed("zone", profile, get_resource_id(zone_id), _fetch_tags)
     except ClientError:
         return False
 
+def iter_record_sets(r53, zone_id: str, start_name: str = None, start_type: str = None,
+                     page_size: int = 300) -> Iterator[Dict]:
+    """
+    Yield the record sets of a zone lazily, one list_resource_record_sets page
+    at a time. start_name/start_type begin the listing at that record.
+    """
+    kwargs = {"HostedZoneId": get_resource_id(zone_id)}
+    if start_name:
+        kwargs["StartRecordName"] = start_name
+        if start_type:
+            kwargs["StartRecordType"] = start_type
+    paginator = r53.get_paginator("list_resource_record_sets")
+    for page in paginator.paginate(**kwargs, PaginationConfig={"PageSize": page_size}):
+        yield from page.get("ResourceRecordSets", [])
+
+def find_record_sets(r53, zone_id: str, name: str, type_: str) -> List[Dict]:
+    """
+    Return the live record sets for one name and type (several for weighted or
+    other routing policies) without listing the rest of the zone.
+    """
+    name, type_ = _normalize_name(name), type_.upper()
+    matches = []
+    for record in iter_record_sets(r53, zone_id, start_name=name, start_type=type_, page_size=LOOKUP_PAGE_SIZE):
+        if _normalize_name(record["Name"]) != name or record["Type"] != type_:
+            break
+        matches.append(record)
+    return matches
+
 def list_records(zone_id: str, profile: str, region: str):
     """List records of a CLI-created zone"""
-    session = make_session(profile, region)
-    r53 = session.client("route53")
+    r53 = get_client("route53", profile, region)
 
-    if not is_cli_zone(r53, zone_id):
-        print(f"Zone {zone_id} is not managed by CLI.")
+    if not is_cli_zone(r53, zone_id, profile):
+        output.error(f"Zone {zone_id} is not managed by CLI.")
         return
 
+    writer = output.RecordWriter(["name", "type", "ttl", "values", "alias_target", "set_identifier"])
     try:
-        resp = r53.list_resource_record_sets(HostedZoneId=get_resource_id(zone_id))
-        for record in resp.get("ResourceRecordSets", []):
-            print(f"{record['Name']} - {record['Type']} - {record.get('TTL', '')} - {record.get('ResourceRecords', '')}")
+        for record in iter_record_sets(r53, zone_id):
+            row = {
+                "name": record["Name"],
+                "type": record["Type"],
+                "ttl": record.get("TTL"),
+                "values": [r["Value"] for r in record.get("ResourceRecords", [])],
+                "alias_target": record.get("AliasTarget", {}).get("DNSName"),
+                "set_identifier": record.get("SetIdentifier"),
+            }
+            writer.write(row, f"{record['Name']} - {record['Type']} - {record.get('TTL', '')} - {record.get('ResourceRecords', '')}")
     except (ClientError, BotoCoreError) as e:
-        print(f"Error: could not list records ({e})")
+        output.error(f"Error: could not list records ({e})")
 
 def create_record(zone_id: str, name: str, type_: str, value: str, ttl: int, profile: str, region: str):
     """Create a record in a CLI-managed zone"""
-    session = make_session(profile, region)
-    r53 = session.client("route53")
+    r53 = get_client("route53", profile, region)
 
-    if not is_cli_zone(r53, zone_id):
-        print(f"Zone {zone_id} is not managed by CLI.")
+    if not is_cli_zone(r53, zone_id, profile):
+        output.error(f"Zone {zone_id} is not managed by CLI.")
         return
 
     try:
@@ -114,64 +191,493 @@ def create_record(zone_id: str, name: str, type_: str, value: str, ttl: int, pro
         )
         print(f"Success: created record {name} ({type_}) in {zone_id}")
     except (ClientError, BotoCoreError) as e:
-        print(f"Error: failed to create record ({e})")
+        output.error(f"Error: failed to create record ({e})")
 
 def update_record(zone_id: str, name: str, type_: str, value: str, ttl: int, profile: str, region: str):
     """Update a record in a CLI-managed zone"""
-    session = make_session(profile, region)
-    r53 = session.client("route53")
+    r53 = get_client("route53", profile, region)
 
-    if not is_cli_zone(r53, zone_id):
-        print(f"Zone {zone_id} is not managed by CLI.")
+    if not is_cli_zone(r53, zone_id, profile):
+        output.error(f"Zone {zone_id} is not managed by CLI.")
         return
 
     try:
+        live = find_record_sets(r53, zone_id, name, type_)
+        if len(live) > 1 or (live and "AliasTarget" in live[0]):
+            output.error(f"Error: {name} ({type_}) is an alias or routing-policy record; "
+                         f"use route53-apply to change it.")
+            return
+
+        record = {"Name": name, "Type": type_, "TTL": ttl, "ResourceRecords": [{"Value": value}]}
+        if live and _comparable(live[0]) == _comparable(record):
+            print(f"Record {name} ({type_}) in {zone_id} is already up to date.")
+            return
+
         r53.change_resource_record_sets(
             HostedZoneId=get_resource_id(zone_id),
             ChangeBatch={
                 "Changes": [
                     {
                         "Action": "UPSERT",
-                        "ResourceRecordSet": {
-                            "Name": name,
-                            "Type": type_,
-                            "TTL": ttl,
-                            "ResourceRecords": [{"Value": value}]
-                        }
+                        "ResourceRecordSet": record
                     }
                 ]
             }
         )
         print(f"Success: updated record {name} ({type_}) in {zone_id}")
     except (ClientError, BotoCoreError) as e:
-        print(f"Error: failed to update record ({e})")
+        output.error(f"Error: failed to update record ({e})")
 
 def delete_record(zone_id: str, name: str, type_: str, value: str, profile: str, region: str):
-    """Delete a record in a CLI-managed zone"""
-    session = make_session(profile, region)
-    r53 = session.client("route53")
+    """
+    Delete a record in a CLI-managed zone.
+    The live record set is looked up so the DELETE matches its TTL exactly;
+    if the set holds other values too, only `value` is removed.
+    """
+    r53 = get_client("route53", profile, region)
 
-    if not is_cli_zone(r53, zone_id):
-        print(f"Zone {zone_id} is not managed by CLI.")
+    if not is_cli_zone(r53, zone_id, profile):
+        output.error(f"Zone {zone_id} is not managed by CLI.")
         return
 
     try:
+        live = [r for r in find_record_sets(r53, zone_id, name, type_)
+                if any(v["Value"] == value for v in r.get("ResourceRecords", []))]
+        if not live:
+            output.error(f"Error: no {type_} record {name} with value {value} in {zone_id}.")
+            return
+
+        record = live[0]
+        remaining = [v for v in record["ResourceRecords"] if v["Value"] != value]
+        if remaining:
+            change = {"Action": "UPSERT", "ResourceRecordSet": {**record, "ResourceRecords": remaining}}
+        else:
+            change = {"Action": "DELETE", "ResourceRecordSet": record}
+
         r53.change_resource_record_sets(
             HostedZoneId=get_resource_id(zone_id),
-            ChangeBatch={
-                "Changes": [
-                    {
-                        "Action": "DELETE",
-                        "ResourceRecordSet": {
-                            "Name": name,
-                            "Type": type_,
-                            "TTL": 300,
-                            "ResourceRecords": [{"Value": value}]
-                        }
-                    }
-                ]
-            }
+            ChangeBatch={"Changes": [change]}
         )
         print(f"Success: deleted record {name} ({type_}) in {zone_id}")
     except (ClientError, BotoCoreError) as e:
-        print(f"Error: failed to delete record ({e})")
+        output.error(f"Error: failed to delete record ({e})")
+
+# bulk apply
+def _normalize_name(name: str) -> str:
+    """Lowercase a DNS name, add the trailing dot and unescape Route53's \\052 wildcard."""
+    name = name.strip().lower().replace("\\052", "*")
+    return name if name.endswith(".") else name + "."
+
+def _record_key(record: Dict) -> Tuple[str, str, str]:
+    return _normalize_name(record["Name"]), record["Type"].upper(), record.get("SetIdentifier", "")
+
+def _comparable(record: Dict) -> Dict:
+    """Return the parts of a record set that matter when diffing."""
+    values = sorted(r["Value"] for r in record.get("ResourceRecords", []))
+    fields = {f: record[f] for f in ROUTING_FIELDS if f in record}
+    return {"TTL": record.get("TTL"), "Values": values, **fields}
+
+def _to_record_set(entry: Dict) -> Dict:
+    """
+    Convert a desired-state entry to a Route53 ResourceRecordSet. Accepts the
+    Route53 shape (Name/Type/TTL/ResourceRecords) or a short form
+    (name/type/ttl/value or values).
+    """
+    if "Name" in entry:
+        record = dict(entry)
+    else:
+        values = entry.get("values", entry.get("value", []))
+        if isinstance(values, str):
+            values = [values]
+        record = {
+            "Name": entry["name"],
+            "Type": entry["type"],
+            "TTL": int(entry.get("ttl", 300)),
+            "ResourceRecords": [{"Value": str(v)} for v in values],
+        }
+    record["Name"] = _normalize_name(record["Name"])
+    record["Type"] = record["Type"].upper()
+    if "AliasTarget" in record:
+        record.pop("TTL", None)
+        record.pop("ResourceRecords", None)
+    return record
+
+def load_record_file(path: str) -> List[Dict]:
+    """Read desired record sets from a YAML, JSON or CSV file."""
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, newline="") as f:
+        if ext == ".csv":
+            # one row per value: name,type,ttl,value
+            merged: Dict[Tuple[str, str], Dict] = {}
+            for row in csv.DictReader(f):
+                key = (_normalize_name(row["name"]), row["type"].upper())
+                entry = merged.setdefault(key, {"name": row["name"], "type": row["type"],
+                                                "ttl": row.get("ttl") or 300, "values": []})
+                entry["values"].append(row["value"])
+            entries = list(merged.values())
+        elif ext in (".yaml", ".yml"):
+            try:
+                import yaml
+            except ImportError:
+                raise ValueError("YAML record files need PyYAML (pip install PyYAML)")
+            entries = yaml.safe_load(f) or []
+        else:
+            entries = json.load(f)
+    if isinstance(entries, dict):
+        entries = entries.get("records", entries.get("ResourceRecordSets", []))
+    return [_to_record_set(e) for e in entries]
+
+def _is_apex_soa_or_ns(record: Dict, zone_name: str) -> bool:
+    return record["Type"] in ("SOA", "NS") and _normalize_name(record["Name"]) == _normalize_name(zone_name)
+
+def plan_changes(current: Iterable[Dict], desired: List[Dict], zone_name: str, prune: bool = False) -> List[Dict]:
+    """
+    Diff desired record sets against the zone and return the minimal list of
+    CREATE/UPSERT/DELETE changes. Apex SOA/NS records are never deleted.
+    """
+    wanted = {_record_key(r): r for r in desired}
+    deletes, creates, upserts = [], [], []
+    seen = set()
+    for record in current:
+        key = _record_key(record)
+        seen.add(key)
+        if key in wanted:
+            if _comparable(wanted[key]) != _comparable(record):
+                upserts.append({"Action": "UPSERT", "ResourceRecordSet": wanted[key]})
+        elif prune and not _is_apex_soa_or_ns(record, zone_name):
+            deletes.append({"Action": "DELETE", "ResourceRecordSet": record})
+    for key, record in wanted.items():
+        if key not in seen:
+            creates.append({"Action": "CREATE", "ResourceRecordSet": record})
+    # Deletes go first so a name can switch type (e.g. CNAME -> A) across batches
+    return deletes + creates + upserts
+
+def _change_cost(change: Dict) -> Tuple[int, int]:
+    """Return (record elements, value characters) a change counts against the batch limits."""
+    values = [r["Value"] for r in change["ResourceRecordSet"].get("ResourceRecords", [])]
+    factor = 2 if change["Action"] == "UPSERT" else 1
+    return factor * max(1, len(values)), factor * sum(len(v) for v in values)
+
+def chunk_changes(changes: Iterable[Dict]) -> Iterator[List[Dict]]:
+    """Group changes into as few batches as the per-request limits allow."""
+    batch, records, chars = [], 0, 0
+    for change in changes:
+        n, c = _change_cost(change)
+        if batch and (records + n > MAX_BATCH_RECORDS or chars + c > MAX_BATCH_CHARS):
+            yield batch
+            batch, records, chars = [], 0, 0
+        batch.append(change)
+        records += n
+        chars += c
+    if batch:
+        yield batch
+
+def _describe_change(change: Dict) -> str:
+    record = change["ResourceRecordSet"]
+    symbol = {"CREATE": "+", "UPSERT": "~", "DELETE": "-"}[change["Action"]]
+    if "AliasTarget" in record:
+        target = f"ALIAS {record['AliasTarget'].get('DNSName', '')}"
+    else:
+        target = f"{record.get('TTL', '')} {' '.join(r['Value'] for r in record.get('ResourceRecords', []))}"
+    return f" {symbol} {record['Name']} {record['Type']} {target}"
+
+def apply_records(zone_id: str, record_file: str, profile: str, region: str, prune: bool = False,
+                  dry_run: bool = False):
+    """
+    Make a CLI-managed zone match a desired-state record file using as few
+    change batches as possible.
+    """
+    r53 = get_client("route53", profile, region)
+
+    if not is_cli_zone(r53, zone_id, profile):
+        output.error(f"Zone {zone_id} is not managed by CLI.")
+        return
+
+    try:
+        desired = load_record_file(record_file)
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        output.error(f"Error: could not read record file {record_file} ({e})")
+        return
+
+    try:
+        zone_name = r53.get_hosted_zone(Id=get_resource_id(zone_id))["HostedZone"]["Name"]
+        changes = plan_changes(iter_record_sets(r53, zone_id), desired, zone_name, prune=prune)
+    except (ClientError, BotoCoreError) as e:
+        output.error(f"Error: could not read zone {zone_id} ({e})")
+        return
+
+    batches = list(chunk_changes(changes))
+    counts = {action: sum(1 for c in changes if c["Action"] == action) for action in ("CREATE", "UPSERT", "DELETE")}
+    print(f"Plan for {zone_name}: {counts['CREATE']} to create, {counts['UPSERT']} to update, "
+          f"{counts['DELETE']} to delete in {len(batches)} batch(es).")
+    if dry_run:
+        for change in changes:
+            print(_describe_change(change))
+        return
+
+    for i, batch in enumerate(batches, 1):
+        try:
+            r53.change_resource_record_sets(
+                HostedZoneId=get_resource_id(zone_id),
+                ChangeBatch={"Comment": "platform-cli apply", "Changes": batch}
+            )
+            print(f"Success: applied batch {i}/{len(batches)} ({len(batch)} changes) to {zone_id}", flush=True)
+        except (ClientError, BotoCoreError) as e:
+            output.error(f"Error: failed to apply batch {i}/{len(batches)} ({e})")
+            return
+
+# zone files (RFC 1035 master file format)
+# Positions of domain names in the values of each type; these are written
+# fully qualified on export and qualified with $ORIGIN on import.
+DOMAIN_FIELDS = {"CNAME": (0,), "NS": (0,), "PTR": (0,), "MX": (1,), "SRV": (3,)}
+TTL_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+DEFAULT_TTL = 300
+
+def _qualify_value(value: str, type_: str, origin: str) -> str:
+    """Make the domain-name fields of a record value absolute."""
+    positions = DOMAIN_FIELDS.get(type_)
+    if not positions:
+        return value
+    fields = value.split()
+    for i in positions:
+        if i < len(fields):
+            if fields[i] == "@":
+                fields[i] = origin
+            elif not fields[i].endswith("."):
+                fields[i] = f"{fields[i]}.{origin}" if origin else fields[i] + "."
+    return " ".join(fields)
+
+def export_zone_file(r53, zone_id: str, zone_name: str, out) -> Tuple[int, int]:
+    """
+    Write a zone as a master file, streaming one list_resource_record_sets
+    page at a time. Returns (record sets written, record sets commented out).
+    Alias and routing-policy record sets have no zone-file form and are
+    written as comments.
+    """
+    out.write(f"; {zone_name} exported by platform-cli from {get_resource_id(zone_id)}\n")
+    out.write(f"$ORIGIN {zone_name}\n")
+    written = skipped = 0
+    for record in iter_record_sets(r53, zone_id):
+        name = record["Name"].replace("\\052", "*")
+        if "AliasTarget" in record or any(f in record for f in ROUTING_FIELDS):
+            out.write(f";{_describe_change({'Action': 'CREATE', 'ResourceRecordSet': record})[2:]}"
+                      f" (not exported: alias or routing policy)\n")
+            skipped += 1
+            continue
+        for rr in record.get("ResourceRecords", []):
+            value = _qualify_value(rr["Value"], record["Type"], "")
+            out.write(f"{name}\t{record.get('TTL', DEFAULT_TTL)}\tIN\t{record['Type']}\t{value}\n")
+        written += 1
+    return written, skipped
+
+def export_zone(zone_id: str, zone_file: str, profile: str, region: str):
+    """Export a CLI-created zone to a BIND zone file ('-' for stdout)."""
+    r53 = get_client("route53", profile, region)
+    to_stdout = zone_file == "-"
+    # With the zone on stdout, keep messages out of it
+    log = sys.stderr if to_stdout else sys.stdout
+
+    if not is_cli_zone(r53, zone_id, profile):
+        output.error(f"Zone {zone_id} is not managed by CLI.", file=log)
+        return
+
+    start = time.perf_counter()
+    try:
+        zone_name = r53.get_hosted_zone(Id=get_resource_id(zone_id))["HostedZone"]["Name"]
+        if to_stdout:
+            written, skipped = export_zone_file(r53, zone_id, zone_name, sys.stdout)
+        else:
+            # Write next to the target and rename, so a failed export never leaves a partial file
+            with open(zone_file + ".tmp", "w") as out:
+                written, skipped = export_zone_file(r53, zone_id, zone_name, out)
+            os.replace(zone_file + ".tmp", zone_file)
+    except OSError as e:
+        output.error(f"Error: could not write {zone_file} ({e})", file=log)
+        return
+    except (ClientError, BotoCoreError) as e:
+        output.error(f"Error: could not read zone {zone_id} ({e})", file=log)
+        return
+    elapsed = time.perf_counter() - start
+    note = f", {skipped} alias/routing-policy set(s) left as comments" if skipped else ""
+    print(f"Success: exported {written} record sets from {zone_name} to {zone_file} "
+          f"in {elapsed:.1f} s{note}", file=log)
+
+def _parse_ttl(token: str) -> int:
+    """Parse a TTL in seconds or BIND units (e.g. 3600, 1h, 1h30m)."""
+    if token.isdigit():
+        return int(token)
+    total, number = 0, ""
+    for ch in token.lower():
+        if ch.isdigit():
+            number += ch
+        elif ch in TTL_UNITS and number:
+            total, number = total + int(number) * TTL_UNITS[ch], ""
+        else:
+            raise ValueError(f"invalid TTL {token!r}")
+    if number:
+        raise ValueError(f"invalid TTL {token!r}")
+    return total
+
+def _is_ttl(token: str) -> bool:
+    try:
+        _parse_ttl(token)
+        return True
+    except ValueError:
+        return False
+
+def _zone_file_entries(lines: Iterable[str]) -> Iterator[Tuple[int, bool, List[str]]]:
+    """
+    Yield (line number, owner omitted, tokens) for each logical entry of a
+    master file: comments are removed, parenthesised continuations joined and
+    quoted strings kept as single tokens (quotes included).
+    """
+    tokens, depth, start, blank_owner = [], 0, 0, False
+    for number, line in enumerate(lines, 1):
+        if depth == 0:
+            start, blank_owner = number, line[:1] in (" ", "\t")
+        token, quoted, escaped = "", False, False
+        for ch in line.rstrip("\r\n"):
+            if quoted:
+                token += ch
+                if escaped:
+                    escaped = False
+                elif ch == "\\":
+                    escaped = True
+                elif ch == '"':
+                    quoted = False
+            elif ch == '"':
+                token += ch
+                quoted = True
+            elif ch == ";":
+                break
+            elif ch in " \t()":
+                if token:
+                    tokens.append(token)
+                    token = ""
+                depth += {"(": 1, ")": -1}.get(ch, 0)
+                if depth < 0:
+                    raise ValueError(f"line {number}: unbalanced ')'")
+            else:
+                token += ch
+        if quoted:
+            raise ValueError(f"line {number}: unterminated quoted string")
+        if token:
+            tokens.append(token)
+        if depth == 0 and tokens:
+            yield start, blank_owner, tokens
+            tokens = []
+    if depth:
+        raise ValueError(f"line {start}: unbalanced '('")
+
+def parse_zone_file(lines: Iterable[str], origin: str) -> Iterator[Dict]:
+    """
+    Yield Route53 record sets from a master file for the zone `origin`, one at
+    a time. Values of one name/type must be on adjacent lines (as exporters
+    write them); a set that reappears later raises ValueError instead of
+    overwriting the first.
+    """
+    origin = zone = _normalize_name(origin)
+    default_ttl, owner, last_ttl = None, None, None
+    current, seen = None, set()
+    for number, blank_owner, tokens in _zone_file_entries(lines):
+        if tokens[0].startswith("$"):
+            directive = tokens[0].upper()
+            if directive == "$ORIGIN" and len(tokens) > 1:
+                origin = _normalize_name(tokens[1])
+            elif directive == "$TTL" and len(tokens) > 1:
+                default_ttl = _parse_ttl(tokens[1])
+            else:
+                raise ValueError(f"line {number}: unsupported directive {tokens[0]}")
+            continue
+
+        if not blank_owner:
+            name = tokens.pop(0)
+            owner = origin if name == "@" else (name if name.endswith(".") else f"{name}.{origin}")
+        if owner is None:
+            raise ValueError(f"line {number}: record without an owner name")
+        ttl = None
+        while tokens and (_is_ttl(tokens[0]) or tokens[0].upper() in ("IN", "CH", "HS")):
+            token = tokens.pop(0)
+            if token.upper() not in ("IN", "CH", "HS"):
+                ttl = _parse_ttl(token)
+        if len(tokens) < 2:
+            raise ValueError(f"line {number}: expected a type and a value")
+        type_ = tokens[0].upper()
+        value = _qualify_value(" ".join(tokens[1:]), type_, origin)
+        ttl = ttl if ttl is not None else (default_ttl if default_ttl is not None else (last_ttl or DEFAULT_TTL))
+        last_ttl = ttl
+
+        name = _normalize_name(owner)
+        if name != zone and not name.endswith("." + zone):
+            raise ValueError(f"line {number}: {name} is outside the zone {zone}")
+        if current and (current["Name"], current["Type"]) == (name, type_):
+            current["ResourceRecords"].append({"Value": value})
+            continue
+        if current:
+            yield current
+        if (name, type_) in seen:
+            raise ValueError(f"line {number}: {name} {type_} continues a record set from earlier lines")
+        seen.add((name, type_))
+        current = {"Name": name, "Type": type_, "TTL": ttl, "ResourceRecords": [{"Value": value}]}
+    if current:
+        yield current
+
+def import_zone(zone_id: str, zone_file: str, profile: str, region: str, dry_run: bool = False):
+    """
+    UPSERT the record sets of a BIND zone file into a CLI-created zone,
+    streaming the file through change batches that respect the Route53
+    limits. The apex SOA and NS records are left to Route53.
+    """
+    r53 = get_client("route53", profile, region)
+
+    if not is_cli_zone(r53, zone_id, profile):
+        output.error(f"Zone {zone_id} is not managed by CLI.")
+        return
+
+    try:
+        zone_name = r53.get_hosted_zone(Id=get_resource_id(zone_id))["HostedZone"]["Name"]
+    except (ClientError, BotoCoreError) as e:
+        output.error(f"Error: could not read zone {zone_id} ({e})")
+        return
+
+    counts = {"imported": 0, "skipped": 0}
+
+    def _changes(record_sets):
+        for record in record_sets:
+            if _is_apex_soa_or_ns(record, zone_name):
+                counts["skipped"] += 1
+                continue
+            yield {"Action": "UPSERT", "ResourceRecordSet": record}
+
+    start = time.perf_counter()
+    batch_number = 0
+    try:
+        with open(zone_file) as f:
+            for batch in chunk_changes(_changes(parse_zone_file(f, zone_name))):
+                batch_number += 1
+                if dry_run:
+                    for change in batch:
+                        print(_describe_change(change))
+                else:
+                    r53.change_resource_record_sets(
+                        HostedZoneId=get_resource_id(zone_id),
+                        ChangeBatch={"Comment": "platform-cli import", "Changes": batch}
+                    )
+                counts["imported"] += len(batch)
+                elapsed = time.perf_counter() - start
+                if not dry_run:
+                    print(f"Batch {batch_number}: {counts['imported']} record sets imported "
+                          f"({counts['imported'] / max(elapsed, 1e-6):.0f}/s)", flush=True)
+    except (OSError, ValueError) as e:
+        output.error(f"Error: could not read zone file {zone_file} ({e}); "
+                     f"{counts['imported']} record sets were already {'planned' if dry_run else 'imported'}.")
+        return
+    except (ClientError, BotoCoreError) as e:
+        output.error(f"Error: failed to apply batch {batch_number} ({e}); "
+                     f"{counts['imported']} record sets were already imported.")
+        return
+
+    elapsed = time.perf_counter() - start
+    verb = "would import" if dry_run else "imported"
+    print(f"Success: {verb} {counts['imported']} record sets into {zone_name} in {batch_number} batch(es), "
+          f"{elapsed:.1f} s; skipped {counts['skipped']} apex SOA/NS record(s).")
@@ -1,15 +1,42 @@
 from botocore.exceptions import ClientError, BotoCoreError
-from utils import default_tags, make_session, yes_no_prompt
-from typing import List, Dict
+from boto3.s3.transfer import TransferConfig
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from utils import default_tags, get_client, has_default_tags, iter_tagged_resources, yes_no_prompt
+import output
+import resource_cache
+from typing import Callable, List, Dict, Iterator, Optional, Tuple
+import glob
+import hashlib
+import itertools
+import json
+import math
+import mmap
 import os
+import time
+
+# Parallel tag lookups when listing buckets
+DEFAULT_CONCURRENCY = 16
+
+# Upload transfer tuning
+MB = 1024 * 1024
+DEFAULT_UPLOAD_WORKERS = 8
+DEFAULT_CHUNK_SIZE_MB = 8
+DEFAULT_MAX_CONCURRENCY = 4
+MAX_PARTS = 10000
+
+# Local record of files already in sync, kept next to the synced tree
+MANIFEST_NAME = ".platform-cli-sync.json"
+
+# delete_objects accepts at most 1000 keys per call
+DELETE_BATCH_SIZE = 1000
+DEFAULT_DELETE_WORKERS = 8
 
 def create_bucket(bucket_name: str, public: bool, profile: str, region: str):
     """
     Create an S3 bucket. Only allows CLI-managed buckets.
     If public=True, ask for explicit confirmation.
     """
-    session = make_session(profile, region)
-    s3 = session.client("s3")
+    s3 = get_client("s3", profile, region)
 
     if public:
         if not yes_no_prompt(f"Bucket {bucket_name} will be public. Are you sure?"):
@@ -27,113 +54,740 @@ def create_bucket(bucket_name: str, public: bool, profile: str, region: str):
             Bucket=bucket_name,
             Tagging={"TagSet": default_tags()}
         )
+        resource_cache.remember("bucket", profile, bucket_name, default_tags())
 
         print(f"Success: created bucket {bucket_name} ({'public' if public else 'private'}).")
     except (ClientError, BotoCoreError) as e:
-        print(f"Error: failed to create bucket ({e}).")
+        output.error(f"Error: failed to create bucket ({e}).")
+
+
+def _bucket_is_cli_managed(s3, bucket_name: str, profile: str) -> bool:
+    """Return True if the bucket carries every CLI default tag, caching what it finds."""
+    try:
+        tags_resp = s3.get_bucket_tagging(Bucket=bucket_name)
+    except ClientError as e:
+        if e.response['Error']['Code'] == "NoSuchTagSet":
+            resource_cache.remember("bucket", profile, bucket_name, [])
+            return False
+        if e.response['Error']['Code'] in ("AccessDenied", "NoSuchBucket"):
+            return False
+        raise
+    tag_set: List[Dict[str, str]] = tags_resp.get("TagSet", [])
+    resource_cache.remember("bucket", profile, bucket_name, tag_set)
+    return has_default_tags(tag_set)
 
 
-def list_buckets(profile: str, region: str):
+def _ensure_cli_bucket(s3, bucket_name: str, profile: str, live: bool = False) -> bool:
+    """
+    Print an error and return False unless the bucket is CLI-managed.
+    Answered from the local inventory cache when possible; live=True always
+    checks the bucket's tags with AWS (used before destructive operations).
+    """
+    def _fetch_tags():
+        return s3.get_bucket_tagging(Bucket=bucket_name).get("TagSet", [])
+
+    try:
+        managed = (_bucket_is_cli_managed(s3, bucket_name, profile) if live
+                   else resource_cache.is_cli_managed("bucket", profile, bucket_name, _fetch_tags))
+        if not managed:
+            output.error(f"Error: bucket {bucket_name} is not managed by this CLI.")
+            return False
+    except ClientError as e:
+        output.error(f"Error: cannot access bucket {bucket_name} tags ({e}).")
+        return False
+    return True
+
+
+def list_buckets(profile: str, region: str, concurrency: int = DEFAULT_CONCURRENCY, use_tagging_api: bool = False):
     """
     List only CLI-managed S3 buckets.
+    Tag checks run on a bounded thread pool and each bucket is printed as soon
+    as it is confirmed. With use_tagging_api=True the CLI-tagged buckets come
+    from the Resource Groups Tagging API instead (buckets in `region` only).
     """
-    session = make_session(profile, region)
-    s3 = session.client("s3")
+    writer = output.RecordWriter(["bucket"])
+    if use_tagging_api:
+        try:
+            for mapping in iter_tagged_resources(profile, region, ["s3"]):
+                # arn:aws:s3:::bucket-name
+                name = mapping["ResourceARN"].split(":::")[-1]
+                writer.write({"bucket": name}, name)
+        except (ClientError, BotoCoreError) as e:
+            output.error(f"Error: could not list buckets ({e}).")
+        return
+
+    concurrency = max(1, concurrency)
+    s3 = get_client("s3", profile, region, max_pool_connections=concurrency)
 
     try:
         resp = s3.list_buckets()
-        buckets = resp.get("Buckets", [])
+        names = [b["Name"] for b in resp.get("Buckets", [])]
 
-        for b in buckets:
-            try:
-                # Get bucket tags
-                tags_resp = s3.get_bucket_tagging(Bucket=b["Name"])
-                tag_set: List[Dict[str, str]] = tags_resp.get("TagSet", [])
-
-                # Only show buckets with all CLI default tags
-                default_tags_list = default_tags()
-                is_cli_bucket = all(
-                    any(t['Key'] == d['Key'] and t['Value'] == d['Value'] for t in tag_set)
-                    for d in default_tags_list
-                )
-
-                if is_cli_bucket:
-                    print(f"{b['Name']}")
-
-            except ClientError as e:
-                if e.response['Error']['Code'] in ("NoSuchTagSet", "AccessDenied"):
-                    continue
-                else:
-                    raise
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            futures = {pool.submit(_bucket_is_cli_managed, s3, name, profile): name for name in names}
+            for future in as_completed(futures):
+                if future.result():
+                    writer.write({"bucket": futures[future]}, futures[future])
     except (ClientError, BotoCoreError) as e:
-        print(f"Error: could not list buckets ({e}).")
+        output.error(f"Error: could not list buckets ({e}).")
 
-def upload_file(bucket_name: str, file_path: str, profile: str, region: str, object_name: str = None):
+def _upload_sources(file_path: str, object_name: Optional[str]) -> List[Tuple[str, str]]:
     """
-    Upload a file to a CLI-managed S3 bucket.
-    Checks that the bucket has CLI default tags before uploading.
+    Expand a file, directory or glob into (local path, object key) pairs;
+    an existing path is never treated as a glob. For directories and globs, object_name is used as a key prefix and keys
+    keep the path below the directory (or the glob's non-wildcard base).
     """
-    session = make_session(profile, region)
-    s3 = session.client("s3")
+    if os.path.isdir(file_path):
+        prefix = object_name or ""
+        pairs = []
+        for root, _dirs, files in os.walk(file_path):
+            for name in sorted(files):
+                path = os.path.join(root, name)
+                rel = os.path.relpath(path, file_path).replace(os.sep, "/")
+                pairs.append((path, prefix + rel))
+        return pairs
+
+    # Only paths that do not exist are expanded, so a file named report[2024].csv uploads as-is
+    if not os.path.exists(file_path) and glob.has_magic(file_path):
+        prefix = object_name or ""
+        # "dist/**/*.js" keeps a/x.js and b/x.js apart by keying on the path below "dist"
+        parts = os.path.normpath(file_path).split(os.sep)
+        base_parts = list(itertools.takewhile(lambda part: not glob.has_magic(part), parts[:-1]))
+        base = os.sep.join(base_parts) or (os.sep if base_parts else os.curdir)
+        return [(path, prefix + os.path.relpath(path, base).replace(os.sep, "/"))
+                for path in sorted(glob.glob(file_path, recursive=True)) if os.path.isfile(path)]
+
+    return [(file_path, object_name or os.path.basename(file_path))]
+
+
+def upload_file(bucket_name: str, file_path: str, profile: str, region: str, object_name: str = None,
+                workers: int = DEFAULT_UPLOAD_WORKERS, chunk_size_mb: int = DEFAULT_CHUNK_SIZE_MB,
+                max_concurrency: int = DEFAULT_MAX_CONCURRENCY):
+    """
+    Upload a file, directory or glob to a CLI-managed S3 bucket.
+    Checks that the bucket has CLI default tags once per batch, then uploads
+    files from a shared worker pool using multipart transfers.
+    """
+    sources = _upload_sources(file_path, object_name)
+    if not sources:
+        output.error(f"Error: no files match {file_path}.")
+        return
+
+    workers = max(1, min(workers, len(sources)))
+    s3 = get_client("s3", profile, region, max_pool_connections=workers * max_concurrency)
 
     # Check if bucket is CLI-managed
+    if not _ensure_cli_bucket(s3, bucket_name, profile):
+        return
+
+    transfer_config = _transfer_config(chunk_size_mb, max_concurrency)
+    _upload_batch(s3, bucket_name, sources, workers, transfer_config, summary=len(sources) > 1)
+
+
+def _transfer_config(chunk_size_mb: int, max_concurrency: int) -> TransferConfig:
+    """Build a TransferConfig whose multipart threshold equals its chunk size."""
+    chunk_size = chunk_size_mb * MB
+    return TransferConfig(
+        multipart_threshold=chunk_size,
+        multipart_chunksize=chunk_size,
+        max_concurrency=max_concurrency,
+    )
+
+
+def _upload_batch(s3, bucket_name: str, sources: List[Tuple[str, str]], workers: int,
+                  transfer_config: TransferConfig, summary: bool = True,
+                  on_uploaded: Optional[Callable[[str, str], None]] = None) -> int:
+    """
+    Upload (path, key) pairs on a thread pool and print each result as it lands.
+    Returns the number of failed uploads.
+    """
+    def _upload(path: str, key: str) -> int:
+        s3.upload_file(path, bucket_name, key, Config=transfer_config)
+        return os.path.getsize(path)
+
+    uploaded, total_bytes, failed = 0, 0, 0
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(_upload, path, key): (path, key) for path, key in sources}
+        for future in as_completed(futures):
+            path, key = futures[future]
+            try:
+                total_bytes += future.result()
+                uploaded += 1
+                print(f"Success: uploaded {path} as {key} to {bucket_name}", flush=True)
+                if on_uploaded:
+                    on_uploaded(path, key)
+            except (ClientError, BotoCoreError, OSError) as e:
+                failed += 1
+                output.error(f"Error: failed to upload {path} ({e})")
+    elapsed = max(time.monotonic() - started, 1e-6)
+
+    if summary:
+        print(f"Uploaded {uploaded} file(s), {total_bytes / MB:.1f} MB in {elapsed:.1f}s "
+              f"({total_bytes / MB / elapsed:.2f} MB/s, {uploaded / elapsed:.2f} files/s)"
+              + (f", {failed} failed." if failed else "."))
+    return failed
+
+
+def compute_etag(file_path: str, chunk_size: int) -> str:
+    """
+    Return the ETag S3 assigns to this file when uploaded with the given
+    multipart chunk size: a plain MD5 below the threshold, otherwise the MD5
+    of the part digests suffixed with the part count. The file is hashed
+    through mmap, so memory use does not depend on file size.
+    """
+    size = os.path.getsize(file_path)
+    if size == 0:
+        return hashlib.md5(b"").hexdigest()
+
+    # Mirror s3transfer's chunk size adjustment for very large files
+    while math.ceil(size / chunk_size) > MAX_PARTS:
+        chunk_size *= 2
+
+    with open(file_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if size < chunk_size:
+            return hashlib.md5(mm).hexdigest()
+        view = memoryview(mm)
+        try:
+            digests = [hashlib.md5(view[offset:offset + chunk_size]).digest()
+                       for offset in range(0, size, chunk_size)]
+        finally:
+            view.release()
+    return f"{hashlib.md5(b''.join(digests)).hexdigest()}-{len(digests)}"
+
+
+def _load_manifest(manifest_path: str) -> Dict[str, Dict]:
     try:
-        tags_resp = s3.get_bucket_tagging(Bucket=bucket_name)
-        tag_set: List[Dict[str, str]] = tags_resp.get("TagSet", [])
-        default_tags_list = default_tags()
-        is_cli_bucket = all(
-            any(t['Key'] == d['Key'] and t['Value'] == d['Value'] for t in tag_set)
-            for d in default_tags_list
-        )
-        if not is_cli_bucket:
-            print(f"Error: bucket {bucket_name} is not managed by this CLI.")
+        with open(manifest_path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        print(f"Warning: ignoring unreadable manifest {manifest_path} ({e}).")
+        return {}
+
+
+def _save_manifest(manifest_path: str, manifest: Dict[str, Dict]):
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+
+def sync_directory(bucket_name: str, local_dir: str, profile: str, region: str, prefix: str = "",
+                   manifest_path: Optional[str] = None, rehash: bool = False, dry_run: bool = False,
+                   workers: int = DEFAULT_UPLOAD_WORKERS, chunk_size_mb: int = DEFAULT_CHUNK_SIZE_MB,
+                   max_concurrency: int = DEFAULT_MAX_CONCURRENCY):
+    """
+    Upload only the files in local_dir that differ from the bucket.
+    Files whose size and mtime match the local manifest are skipped without
+    hashing. Other files are compared to the remote object by size and
+    multipart ETag, and the manifest is updated so the next run is free.
+    """
+    if not os.path.isdir(local_dir):
+        output.error(f"Error: {local_dir} is not a directory.")
+        return
+
+    if manifest_path is None:
+        manifest_path = os.path.join(local_dir, MANIFEST_NAME)
+    manifest_abs = os.path.abspath(manifest_path)
+    sources = [(path, key) for path, key in _upload_sources(local_dir, prefix)
+               if os.path.abspath(path) not in (manifest_abs, f"{manifest_abs}.tmp")]
+
+    s3 = get_client("s3", profile, region, max_pool_connections=max(1, workers) * max_concurrency)
+
+    # Check if bucket is CLI-managed
+    if not _ensure_cli_bucket(s3, bucket_name, profile):
+        return
+
+    manifest = {} if rehash else _load_manifest(manifest_path)
+    chunk_size = chunk_size_mb * MB
+    stats: Dict[str, Tuple[int, int]] = {}
+    candidates = []
+    for path, key in sources:
+        st = os.stat(path)
+        stats[key] = (st.st_size, st.st_mtime_ns)
+        entry = manifest.get(f"s3://{bucket_name}/{key}")
+        if entry and (entry["size"], entry["mtime_ns"]) == stats[key]:
+            continue
+        candidates.append((path, key))
+
+    to_upload = []
+    hashed = 0
+    if candidates:
+        try:
+            remote = {obj["Key"]: (obj["Size"], obj["ETag"].strip('"'))
+                      for obj in iter_objects(s3, bucket_name, prefix=prefix)}
+        except (ClientError, BotoCoreError) as e:
+            output.error(f"Error: failed to list files ({e})")
             return
-    except ClientError as e:
-        print(f"Error: cannot access bucket {bucket_name} tags ({e}).")
+        for path, key in candidates:
+            size, mtime_ns = stats[key]
+            remote_size, remote_etag = remote.get(key, (None, None))
+            if remote_size == size:
+                hashed += 1
+                if compute_etag(path, chunk_size) == remote_etag:
+                    manifest[f"s3://{bucket_name}/{key}"] = {"size": size, "mtime_ns": mtime_ns}
+                    continue
+            to_upload.append((path, key))
+
+    skipped = len(sources) - len(to_upload)
+    print(f"{len(to_upload)} to upload, {skipped} unchanged ({hashed} hashed) in {local_dir}.")
+    if dry_run:
+        for path, key in to_upload:
+            print(f" + {path} -> {key}")
         return
 
-    if object_name is None:
-        object_name = os.path.basename(file_path)
+    def _record(path: str, key: str):
+        size, mtime_ns = stats[key]
+        manifest[f"s3://{bucket_name}/{key}"] = {"size": size, "mtime_ns": mtime_ns}
 
     try:
-        s3.upload_file(file_path, bucket_name, object_name)
-        print(f"Success: uploaded {file_path} as {object_name} to {bucket_name}")
-    except (ClientError, BotoCoreError) as e:
-        print(f"Error: failed to upload file ({e})")
+        if to_upload:
+            _upload_batch(s3, bucket_name, to_upload, workers, _transfer_config(chunk_size_mb, max_concurrency),
+                          on_uploaded=_record)
+    finally:
+        try:
+            _save_manifest(manifest_path, manifest)
+        except OSError as e:
+            print(f"Warning: could not write manifest {manifest_path} ({e}).")
 
 
-def list_files(bucket_name: str, profile: str, region: str):
+def iter_objects(s3, bucket_name: str, prefix: str = "", delimiter: str = "", max_keys: Optional[int] = None,
+                 page_size: int = 1000) -> Iterator[Dict]:
+    """
+    Yield objects (and CommonPrefixes entries) page by page from list_objects_v2.
+    Only one page is held in memory at a time; max_keys caps the total yielded.
+    """
+    paginator = s3.get_paginator("list_objects_v2")
+    kwargs = {"Bucket": bucket_name, "Prefix": prefix}
+    if delimiter:
+        kwargs["Delimiter"] = delimiter
+
+    if max_keys is not None:
+        page_size = min(page_size, max_keys)
+
+    remaining = max_keys
+    for page in paginator.paginate(**kwargs, PaginationConfig={"PageSize": page_size}):
+        for item in page.get("CommonPrefixes", []) + page.get("Contents", []):
+            yield item
+            if remaining is not None:
+                remaining -= 1
+                # Stop before the paginator fetches another page
+                if remaining <= 0:
+                    return
+
+
+def list_files(bucket_name: str, profile: str, region: str, prefix: str = "", delimiter: str = "",
+               max_keys: Optional[int] = None):
     """
     List objects in a CLI-managed S3 bucket.
     Only lists files if the bucket has CLI default tags.
+    Keys are streamed as each listing page arrives.
     """
-    session = make_session(profile, region)
-    s3 = session.client("s3")
+    s3 = get_client("s3", profile, region)
 
     # Check if bucket is CLI-managed
+    if not _ensure_cli_bucket(s3, bucket_name, profile):
+        return
+
+    # List objects
+    writer = output.RecordWriter(["key", "type", "size", "last_modified", "storage_class", "etag"])
     try:
-        tags_resp = s3.get_bucket_tagging(Bucket=bucket_name)
-        tag_set: List[Dict[str, str]] = tags_resp.get("TagSet", [])
-        is_cli_bucket = all(
-            any(t['Key'] == d['Key'] and t['Value'] == d['Value'] for t in tag_set)
-            for d in default_tags()
-        )
-        if not is_cli_bucket:
-            print(f"Error: bucket {bucket_name} is not managed by this CLI.")
+        found = False
+        for obj in iter_objects(s3, bucket_name, prefix=prefix, delimiter=delimiter, max_keys=max_keys):
+            if not found:
+                output.info(f"Files in {bucket_name}:")
+                found = True
+            if "Prefix" in obj:
+                writer.write({"key": obj["Prefix"], "type": "prefix"}, f" - {obj['Prefix']} (prefix)")
+            else:
+                record = {
+                    "key": obj["Key"],
+                    "type": "object",
+                    "size": obj.get("Size"),
+                    "last_modified": obj.get("LastModified"),
+                    "storage_class": obj.get("StorageClass"),
+                    "etag": obj.get("ETag", "").strip('"'),
+                }
+                writer.write(record, f" - {obj['Key']}")
+        if not found:
+            output.info(f"No files found in {bucket_name}.")
+    except (ClientError, BotoCoreError) as e:
+        output.error(f"Error: failed to list files ({e})")
+
+
+def _etag_matches(path: str, size: int, etag: str, chunk_size: int) -> bool:
+    """
+    Return True if a local file has the given S3 ETag. Multipart ETags depend
+    on the part size used at upload, so besides chunk_size the part size
+    implied by the part count (rounded up to whole MB) is tried.
+    """
+    candidates = [chunk_size]
+    if "-" in etag:
+        parts = int(etag.rsplit("-", 1)[1])
+        implied = math.ceil(size / parts / MB) * MB
+        if implied and implied != chunk_size:
+            candidates.append(implied)
+    return any(compute_etag(path, c) == etag for c in candidates)
+
+
+def _download_targets(s3, bucket_name: str, key: Optional[str], prefix: str,
+                      dest: str) -> Iterator[Tuple[str, str, int, str]]:
+    """
+    Yield (key, local path, size, etag) for one object, or for every object
+    under a prefix (mirrored below dest). Folder markers are skipped.
+    """
+    if key is not None:
+        head = s3.head_object(Bucket=bucket_name, Key=key)
+        path = os.path.join(dest, os.path.basename(key)) if os.path.isdir(dest) else dest
+        yield key, path, head["ContentLength"], head["ETag"].strip('"')
+        return
+
+    root = os.path.abspath(dest)
+    for obj in iter_objects(s3, bucket_name, prefix=prefix):
+        if obj["Key"].endswith("/"):
+            continue
+        path = os.path.abspath(os.path.join(root, obj["Key"][len(prefix):].lstrip("/")))
+        if not path.startswith(root + os.sep):
+            output.error(f"Error: skipping {obj['Key']}, it would be written outside {dest}.")
+            continue
+        yield obj["Key"], path, obj["Size"], obj["ETag"].strip('"')
+
+
+def _download_small(s3, bucket_name: str, key: str, path: str):
+    """Fetch an object with a single GET (no HEAD) and move it into place once complete."""
+    body = s3.get_object(Bucket=bucket_name, Key=key)["Body"]
+    try:
+        with open(path + ".part", "wb") as f:
+            for chunk in body.iter_chunks(MB):
+                f.write(chunk)
+        os.replace(path + ".part", path)
+    except BaseException:
+        if os.path.exists(path + ".part"):
+            os.remove(path + ".part")
+        raise
+
+
+def download_files(bucket_name: str, profile: str, region: str, key: Optional[str] = None, prefix: str = "",
+                   dest: str = ".", workers: int = DEFAULT_UPLOAD_WORKERS,
+                   chunk_size_mb: int = DEFAULT_CHUNK_SIZE_MB, max_concurrency: int = DEFAULT_MAX_CONCURRENCY):
+    """
+    Download one object, or every object under a prefix, from a CLI-managed
+    bucket. Files whose size and ETag already match are skipped. Objects
+    smaller than the chunk size are fetched with one GET each from a shared
+    worker pool; larger ones use parallel ranged GETs (max_concurrency per file).
+    """
+    s3 = get_client("s3", profile, region, max_pool_connections=max(1, workers) * max_concurrency)
+
+    # Check if bucket is CLI-managed
+    if not _ensure_cli_bucket(s3, bucket_name, profile):
+        return
+
+    chunk_size = chunk_size_mb * MB
+    transfer_config = _transfer_config(chunk_size_mb, max_concurrency)
+
+    def _download(obj_key: str, path: str, size: int, etag: str) -> int:
+        if os.path.isfile(path) and os.path.getsize(path) == size and _etag_matches(path, size, etag, chunk_size):
+            return -1
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if size < chunk_size:
+            _download_small(s3, bucket_name, obj_key, path)
+        else:
+            s3.download_file(bucket_name, obj_key, path, Config=transfer_config)
+        return size
+
+    downloaded, skipped, failed, total_bytes = 0, 0, 0, 0
+    started = time.monotonic()
+
+    def _collect(done):
+        nonlocal downloaded, skipped, failed, total_bytes
+        for future in done:
+            obj_key, path = pending.pop(future)[:2]
+            try:
+                size = future.result()
+            except (ClientError, BotoCoreError, OSError) as e:
+                failed += 1
+                output.error(f"Error: failed to download {obj_key} ({e})")
+                continue
+            if size < 0:
+                skipped += 1
+            else:
+                downloaded += 1
+                total_bytes += size
+                print(f"Success: downloaded {obj_key} from {bucket_name} to {path}", flush=True)
+
+    # Downloads start while the listing continues; at most 2 * workers are queued at once
+    pending: Dict = {}
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            for target in _download_targets(s3, bucket_name, key, prefix, dest):
+                pending[pool.submit(_download, *target)] = target
+                if len(pending) >= 2 * workers:
+                    _collect(wait(pending, return_when=FIRST_COMPLETED).done)
+            _collect(as_completed(list(pending)))
+    except (ClientError, BotoCoreError) as e:
+        _collect(as_completed(list(pending)))
+        output.error(f"Error: could not read {key or prefix or 'objects'} in {bucket_name} ({e})")
+        return
+    elapsed = max(time.monotonic() - started, 1e-6)
+
+    if downloaded + skipped + failed == 0:
+        print(f"No files found in {bucket_name}" + (f" under {prefix}." if prefix else "."))
+        return
+    print(f"Downloaded {downloaded} file(s), {total_bytes / MB:.1f} MB in {elapsed:.1f}s "
+          f"({total_bytes / MB / elapsed:.2f} MB/s, {downloaded / elapsed:.2f} files/s), "
+          f"{skipped} already up to date" + (f", {failed} failed." if failed else "."))
+
+
+def _iter_delete_targets(s3, bucket_name: str, prefix: str = "", all_versions: bool = False) -> Iterator[Dict]:
+    """
+    Yield delete_objects entries page by page: current keys from
+    list_objects_v2, or every version and delete marker from
+    list_object_versions when all_versions is set.
+    """
+    if not all_versions:
+        for obj in iter_objects(s3, bucket_name, prefix=prefix):
+            yield {"Key": obj["Key"]}
+        return
+    paginator = s3.get_paginator("list_object_versions")
+    for page in paginator.paginate(Bucket=bucket_name, Prefix=prefix):
+        for version in page.get("Versions", []) + page.get("DeleteMarkers", []):
+            yield {"Key": version["Key"], "VersionId": version["VersionId"]}
+
+
+def _delete_batches(s3, bucket_name: str, targets: Iterator[Dict], workers: int) -> Tuple[int, int]:
+    """
+    Delete targets in batches of DELETE_BATCH_SIZE on a thread pool while the
+    listing continues. At most 2 * workers batches are held at once, so memory
+    stays flat however many keys there are. Returns (deleted, failed).
+    """
+    def _delete(batch: List[Dict]) -> Tuple[int, List[Dict]]:
+        resp = s3.delete_objects(Bucket=bucket_name, Delete={"Objects": batch, "Quiet": True})
+        return len(batch), resp.get("Errors", [])
+
+    deleted, failed = 0, 0
+    started = time.monotonic()
+
+    def _collect(done):
+        nonlocal deleted, failed
+        for future in done:
+            try:
+                count, errors = future.result()
+            except (ClientError, BotoCoreError) as e:
+                failed += 1
+                output.error(f"Error: failed to delete a batch ({e})")
+                continue
+            for error in errors[:3]:
+                output.error(f"Error: could not delete {error.get('Key')} "
+                             f"({error.get('Code')}: {error.get('Message')})")
+            failed += len(errors)
+            deleted += count - len(errors)
+            elapsed = max(time.monotonic() - started, 1e-6)
+            print(f"Deleted {deleted} object(s) ({deleted / elapsed:.0f}/s)", flush=True)
+
+    pending = set()
+    batch: List[Dict] = []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for target in targets:
+            batch.append(target)
+            if len(batch) < DELETE_BATCH_SIZE:
+                continue
+            pending.add(pool.submit(_delete, batch))
+            batch = []
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                _collect(done)
+        if batch:
+            pending.add(pool.submit(_delete, batch))
+        _collect(as_completed(pending))
+    return deleted, failed
+
+
+def delete_files(bucket_name: str, prefix: str, profile: str, region: str, all_versions: bool = False,
+                 assume_yes: bool = False, workers: int = DEFAULT_DELETE_WORKERS):
+    """
+    Delete every object under a prefix in a CLI-managed bucket, after
+    confirmation. With all_versions, old versions and delete markers are
+    removed too (permanent in versioned buckets).
+    """
+    s3 = get_client("s3", profile, region, max_pool_connections=workers)
+
+    # Check if bucket is CLI-managed
+    if not _ensure_cli_bucket(s3, bucket_name, profile, live=True):
+        return
+
+    what = "every version of every object" if all_versions else "every object"
+    if not assume_yes and not yes_no_prompt(f"Delete {what} under {prefix} in {bucket_name}?"):
+        print("Aborted: nothing deleted.")
+        return
+
+    try:
+        deleted, failed = _delete_batches(s3, bucket_name, _iter_delete_targets(s3, bucket_name, prefix, all_versions),
+                                          workers)
+    except (ClientError, BotoCoreError) as e:
+        output.error(f"Error: failed to list files ({e})")
+        return
+    if deleted == 0 and failed == 0:
+        print(f"No files found in {bucket_name} under {prefix}.")
+    elif failed:
+        output.error(f"Error: deleted {deleted} object(s) under {prefix} in {bucket_name}, {failed} failed.")
+    else:
+        print(f"Success: deleted {deleted} object(s) under {prefix} in {bucket_name}.")
+
+
+def _abort_multipart_uploads(s3, bucket_name: str) -> int:
+    """Abort unfinished multipart uploads so their parts are not left behind."""
+    aborted = 0
+    for page in s3.get_paginator("list_multipart_uploads").paginate(Bucket=bucket_name):
+        for upload in page.get("Uploads", []):
+            s3.abort_multipart_upload(Bucket=bucket_name, Key=upload["Key"], UploadId=upload["UploadId"])
+            aborted += 1
+    return aborted
+
+
+def delete_bucket(bucket_name: str, profile: str, region: str, force: bool = False, assume_yes: bool = False,
+                  workers: int = DEFAULT_DELETE_WORKERS):
+    """
+    Delete a CLI-managed bucket after confirmation. With force, the bucket is
+    emptied first: every object version, delete marker and unfinished
+    multipart upload is removed.
+    """
+    s3 = get_client("s3", profile, region, max_pool_connections=workers)
+
+    # Check if bucket is CLI-managed
+    if not _ensure_cli_bucket(s3, bucket_name, profile, live=True):
+        return
+
+    question = (f"Bucket {bucket_name} and ALL of its objects and versions will be deleted. Are you sure?" if force
+                else f"Delete bucket {bucket_name}?")
+    if not assume_yes and not yes_no_prompt(question):
+        print("Aborted: bucket deletion canceled by user.")
+        return
+
+    if force:
+        try:
+            _abort_multipart_uploads(s3, bucket_name)
+            deleted, failed = _delete_batches(s3, bucket_name, _iter_delete_targets(s3, bucket_name, all_versions=True),
+                                              workers)
+        except (ClientError, BotoCoreError) as e:
+            output.error(f"Error: failed to empty bucket {bucket_name} ({e})")
+            return
+        if failed:
+            output.error(f"Error: {failed} object(s) could not be deleted; bucket {bucket_name} was kept.")
             return
+
+    try:
+        s3.delete_bucket(Bucket=bucket_name)
     except ClientError as e:
-        print(f"Error: cannot access bucket {bucket_name} tags ({e}).")
+        if e.response.get("Error", {}).get("Code") == "BucketNotEmpty":
+            output.error(f"Error: bucket {bucket_name} is not empty (use --force to delete its objects too).")
+        else:
+            output.error(f"Error: failed to delete bucket {bucket_name} ({e})")
+        return
+    except BotoCoreError as e:
+        output.error(f"Error: failed to delete bucket {bucket_name} ({e})")
         return
+    resource_cache.forget("bucket", profile, bucket_name)
+    print(f"Success: deleted bucket {bucket_name}.")
 
-    # List objects
+
+class _Usage:
+    """Running totals for one prefix; one of these per prefix, never per object."""
+    __slots__ = ("objects", "bytes", "classes")
+
+    def __init__(self):
+        self.objects = 0
+        self.bytes = 0
+        self.classes: Dict[str, int] = {}
+
+    def add(self, size: int, storage_class: str, objects: int = 1):
+        self.objects += objects
+        self.bytes += size
+        self.classes[storage_class] = self.classes.get(storage_class, 0) + size
+
+    def merge(self, other: "_Usage"):
+        self.objects += other.objects
+        self.bytes += other.bytes
+        for storage_class, size in other.classes.items():
+            self.classes[storage_class] = self.classes.get(storage_class, 0) + size
+
+
+def _human_size(size: float) -> str:
+    for unit in ("B", "KB", "MB", "GB", "TB"):
+        if size < 1024 or unit == "TB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def _aggregate(objects: Iterator[Dict], prefix: str, depth: int) -> Dict[str, _Usage]:
+    """Add each object to every enclosing prefix below `prefix`, down to `depth` levels."""
+    usage: Dict[str, _Usage] = {}
+    for obj in objects:
+        size, storage_class = obj.get("Size", 0), obj.get("StorageClass", "STANDARD")
+        parts = obj["Key"][len(prefix):].split("/")[:-1]
+        group = prefix
+        for part in parts[:depth]:
+            group += part + "/"
+            usage.setdefault(group, _Usage()).add(size, storage_class)
+        usage.setdefault(prefix, _Usage()).add(size, storage_class)
+    return usage
+
+
+def disk_usage(bucket_name: str, profile: str, region: str, prefix: str = "", depth: int = 1, top: int = 20,
+               workers: int = DEFAULT_CONCURRENCY):
+    """
+    Report object count, bytes and storage-class breakdown per prefix of a
+    CLI-managed bucket, down to `depth` levels below prefix, largest first.
+    Each top-level prefix is listed on its own worker and aggregated as it
+    streams, so memory grows with the number of prefixes, not objects.
+    """
+    s3 = get_client("s3", profile, region, max_pool_connections=workers)
+
+    # Check if bucket is CLI-managed
+    if not _ensure_cli_bucket(s3, bucket_name, profile):
+        return
+
+    total: Dict[str, _Usage] = {}
+    started = time.monotonic()
     try:
-        resp = s3.list_objects_v2(Bucket=bucket_name)
-        objects = resp.get("Contents", [])
-        if not objects:
-            print(f"No files found in {bucket_name}.")
-        else:
-            print(f"Files in {bucket_name}:")
-            for obj in objects:
-                print(f" - {obj['Key']}")
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            futures = []
+
+            def _direct_objects():
+                # One delimited listing: objects directly under prefix are aggregated as they
+                # stream, and each top-level prefix is handed to a worker as soon as it appears
+                # (iter_objects is lazy, so that prefix's pages are fetched on the worker)
+                for item in iter_objects(s3, bucket_name, prefix=prefix, delimiter="/"):
+                    if "Prefix" in item:
+                        futures.append(pool.submit(_aggregate, iter_objects(s3, bucket_name, prefix=item["Prefix"]),
+                                                   prefix, depth))
+                    else:
+                        yield item
+
+            partials = [_aggregate(_direct_objects(), prefix, depth)]
+            for future in as_completed(futures):
+                partials.append(future.result())
     except (ClientError, BotoCoreError) as e:
-        print(f"Error: failed to list files ({e})")
+        output.error(f"Error: failed to list files ({e})")
+        return
+    for partial in partials:
+        for group, usage in partial.items():
+            total.setdefault(group, _Usage()).merge(usage)
+
+    overall = total.pop(prefix, None)
+    if overall is None:
+        output.info(f"No files found in {bucket_name}" + (f" under {prefix}." if prefix else "."))
+        return
+
+    rows = sorted(total.items(), key=lambda item: (-item[1].bytes, item[0]))[:top]
+    writer = output.RecordWriter(["prefix", "objects", "bytes", "storage_classes"])
+    if not output.machine_readable():
+        print(f"{'SIZE':>10}  {'OBJECTS':>10}  PREFIX")
+    for group, usage in rows + [(prefix or "(total)", overall)]:
+        classes = " ".join(f"{c}={_human_size(b)}" for c, b in sorted(usage.classes.items(), key=lambda i: -i[1]))
+        writer.write({"prefix": group, "objects": usage.objects, "bytes": usage.bytes,
+                      "storage_classes": dict(usage.classes)},
+                     f"{_human_size(usage.bytes):>10}  {usage.objects:>10}  {group}  [{classes}]")
+    output.info(f"Scanned {overall.objects} object(s) in {bucket_name} in {time.monotonic() - started:.1f}s"
+                + (f"; showing the largest {len(rows)} of {len(total)} prefixes." if len(total) > len(rows) else "."))
@@ -1,4 +1,8 @@
-import boto3
+import os
+import random
+import threading
+import time
+import output
 
 # Tags
 CREATED_BY = "platform-cli"
@@ -20,10 +24,288 @@ def is_cli_resource(tags):
     tag_dict = {t['Key']: t['Value'] for t in tags}
     return tag_dict.get('CreatedBy') == CREATED_BY and tag_dict.get('Owner') == OWNER
 
+def has_default_tags(tags):
+    """Return True if the tag set contains every CLI default tag."""
+    return all(
+        any(t['Key'] == d['Key'] and t['Value'] == d['Value'] for t in tags)
+        for d in default_tags()
+    )
+
+def default_tag_filters():
+    """Return the CLI default tags as Resource Groups Tagging API TagFilters."""
+    return [{"Key": d["Key"], "Values": [d["Value"]]} for d in default_tags()]
+
+def iter_tagged_resources(profile, region, resource_types):
+    """
+    Yield Resource Groups Tagging API mappings for CLI-tagged resources.
+    Uses the get_resources paginator, so one call covers a full page of resources.
+    """
+    tagging = get_client("resourcegroupstaggingapi", profile, region)
+    paginator = tagging.get_paginator("get_resources")
+    for page in paginator.paginate(TagFilters=default_tag_filters(), ResourceTypeFilters=resource_types):
+        yield from page.get("ResourceTagMappingList", [])
+
+def chunks(items, size):
+    """Yield consecutive slices of at most size items."""
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def enabled_regions(profile, region):
+    """Return the regions enabled for the account behind this profile."""
+    ec2 = get_client("ec2", profile, region)
+    resp = ec2.describe_regions(AllRegions=False)
+    return sorted(r["RegionName"] for r in resp.get("Regions", []))
+
+def resolve_targets(profiles, region):
+    """Expand profiles and a region (or 'all') into (profile, region) pairs."""
+    from botocore.exceptions import BotoCoreError, ClientError
+
+    targets = []
+    for profile in profiles:
+        if region == "all":
+            try:
+                targets.extend((profile, r) for r in enabled_regions(profile, "us-east-1"))
+            except (ClientError, BotoCoreError) as e:
+                output.error(f"Error: could not list regions for profile {profile} ({e}).")
+        else:
+            targets.append((profile, region))
+    return targets
+
 def make_session(profile, region):
     """Create a boto3 session with given profile and region."""
+    import boto3  # deferred so importing utils stays cheap for the CLI
     return boto3.Session(profile_name=profile, region_name=region)
 
+# Client registry: one session per profile and one client per
+# (profile, region, service), shared by every thread in the process.
+CLIENT_SETTINGS = {
+    "max_pool_connections": 32,
+    "connect_timeout": 10,
+    "read_timeout": 60,
+    "tcp_keepalive": True,
+    "retry_mode": "adaptive",
+    "max_attempts": 10,
+}
+# Guards the dicts below only; clients are built outside it
+_registry_lock = threading.Lock()
+_sessions = {}
+_session_locks = {}
+_clients = {}
+_client_locks = {}
+_client_hooks = []
+
+def configure_clients(**settings):
+    """Override CLIENT_SETTINGS (pool size, timeouts, keep-alive) and drop cached clients."""
+    unknown = set(settings) - set(CLIENT_SETTINGS)
+    if unknown:
+        raise ValueError(f"Unknown client settings: {', '.join(sorted(unknown))}")
+    with _registry_lock:
+        CLIENT_SETTINGS.update(settings)
+        _clients.clear()
+
+def register_client_hook(hook):
+    """
+    Call hook(client, service) for every client the registry creates, and for
+    the ones it already holds. Used to attach botocore event handlers.
+    """
+    with _registry_lock:
+        _client_hooks.append(hook)
+        existing = [(key[2], client) for key, (client, _pool) in _clients.items()]
+    for service, client in existing:
+        hook(client, service)
+
+def get_session(profile):
+    """
+    Return the shared boto3 session for a profile and the lock to hold while
+    using it. One session per profile means credentials and service models
+    are loaded once, whatever the number of regions.
+    """
+    with _registry_lock:
+        session = _sessions.get(profile)
+        if session is None:
+            session = _sessions[profile] = make_session(profile, None)
+            _session_locks[profile] = threading.Lock()
+        return session, _session_locks[profile]
+
+def get_client(service, profile, region, max_pool_connections=None):
+    """
+    Return the shared client for (profile, region, service), creating it on
+    first use. Asking for a larger connection pool than the cached client
+    has replaces it with a bigger one.
+    """
+    key = (profile, region, service)
+
+    def _cached():
+        cached = _clients.get(key)
+        if cached and (max_pool_connections is None or cached[1] >= max_pool_connections):
+            return cached[0]
+        return None
+
+    with _registry_lock:
+        client = _cached()
+        if client is not None:
+            return client
+        key_lock = _client_locks.setdefault(key, threading.Lock())
+
+    # Only threads wanting this very client wait here; other regions and services build in parallel
+    with key_lock:
+        with _registry_lock:
+            client = _cached()
+            if client is not None:
+                return client
+        from botocore.config import Config
+
+        pool_size = max(max_pool_connections or 0, CLIENT_SETTINGS["max_pool_connections"])
+        config = Config(
+            max_pool_connections=pool_size,
+            connect_timeout=CLIENT_SETTINGS["connect_timeout"],
+            read_timeout=CLIENT_SETTINGS["read_timeout"],
+            tcp_keepalive=CLIENT_SETTINGS["tcp_keepalive"],
+            retries={"mode": CLIENT_SETTINGS["retry_mode"], "max_attempts": CLIENT_SETTINGS["max_attempts"]},
+        )
+        session, session_lock = get_session(profile)
+        # boto3 sessions are not thread-safe; with the service model already
+        # loaded, building a client from a warm session is quick
+        with session_lock:
+            client = session.client(service, region_name=region, config=config)
+        with _registry_lock:
+            limiter = _get_limiter_locked(service)
+            hooks = list(_client_hooks)
+        _attach_rate_limiter(client, limiter)
+        for hook in hooks:
+            hook(client, service)
+        with _registry_lock:
+            _clients[key] = (client, pool_size)
+            late_hooks = _client_hooks[len(hooks):]  # registered while this client was being built
+        for hook in late_hooks:
+            hook(client, service)
+        return client
+
+# Client-side rate limiting, shared by every thread and client of a service.
+# Requests per second; services not listed are not limited.
+RATE_LIMITS = {
+    "route53": 5.0,
+    "ec2": 20.0,
+}
+# Backoff applied to the whole service after a throttling error:
+# min(BACKOFF_MAX, BACKOFF_BASE * 2 ** consecutive_throttles), scaled by a random jitter factor
+BACKOFF_SETTINGS = {
+    "base": 0.5,
+    "max": 20.0,
+    "jitter": 0.5,
+}
+THROTTLE_CODES = {
+    "Throttling", "ThrottlingException", "ThrottledException", "RequestThrottledException",
+    "TooManyRequestsException", "RequestLimitExceeded", "SlowDown", "PriorRequestNotComplete",
+    "RequestThrottled", "ProvisionedThroughputExceededException",
+}
+
+class RateLimiter:
+    """Token bucket with a shared, jittered backoff after throttling errors."""
+
+    def __init__(self, rate):
+        if not rate > 0:
+            raise ValueError(f"rate must be positive, got {rate!r}")
+        self.rate = rate
+        # Below 1 request/second the bucket still has to hold one whole token
+        self.capacity = max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.consecutive_throttles = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.throttles = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be sent; return the seconds waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if now >= self.blocked_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    if waited:
+                        self.waits += 1
+                        self.wait_seconds += waited
+                    return waited
+                delay = max(self.blocked_until - now, (1 - self.tokens) / self.rate)
+            time.sleep(delay)
+            waited += delay
+
+    def throttled(self):
+        """Record a throttling error and hold back every caller for a jittered backoff."""
+        with self._lock:
+            self.throttles += 1
+            backoff = min(BACKOFF_SETTINGS["max"], BACKOFF_SETTINGS["base"] * 2 ** self.consecutive_throttles)
+            backoff *= 1 - BACKOFF_SETTINGS["jitter"] * random.random()
+            self.consecutive_throttles += 1
+            self.blocked_until = max(self.blocked_until, time.monotonic() + backoff)
+
+    def succeeded(self):
+        with self._lock:
+            self.consecutive_throttles = 0
+
+_limiters = {}
+
+def configure_rate_limits(limits=None, **backoff):
+    """Override RATE_LIMITS (service -> requests/second) and BACKOFF_SETTINGS."""
+    unknown = set(backoff) - set(BACKOFF_SETTINGS)
+    if unknown:
+        raise ValueError(f"Unknown backoff settings: {', '.join(sorted(unknown))}")
+    invalid = [service for service, rate in (limits or {}).items() if not rate >= 0]
+    if invalid:
+        raise ValueError(f"Rate limits must be 0 (off) or positive: {', '.join(sorted(invalid))}")
+    with _registry_lock:
+        RATE_LIMITS.update(limits or {})
+        BACKOFF_SETTINGS.update(backoff)
+        _limiters.clear()
+        _clients.clear()
+
+def _get_limiter_locked(service):
+    limiter = _limiters.get(service)
+    if limiter is None and RATE_LIMITS.get(service):
+        limiter = _limiters[service] = RateLimiter(RATE_LIMITS[service])
+    return limiter
+
+def _attach_rate_limiter(client, limiter):
+    if limiter is None:
+        return
+
+    def before_send(**_kwargs):
+        limiter.acquire()
+
+    def needs_retry(response, **_kwargs):
+        if response and response[1].get("Error", {}).get("Code") in THROTTLE_CODES:
+            limiter.throttled()
+
+    def after_call(**_kwargs):
+        limiter.succeeded()
+
+    # first, so the limiter runs before any handler that sends the request
+    client.meta.events.register_first("before-send", before_send)
+    client.meta.events.register("needs-retry", needs_retry)
+    client.meta.events.register("after-call", after_call)
+
+def rate_limiter_stats():
+    """Return {service: {rate, waits, wait_seconds, throttles}} for the limiters used so far."""
+    with _registry_lock:
+        limiters = dict(_limiters)
+    return {
+        service: {"rate": l.rate, "waits": l.waits, "wait_seconds": round(l.wait_seconds, 3), "throttles": l.throttles}
+        for service, l in sorted(limiters.items())
+    }
+
+def cache_dir():
+    """Return (and create) the per-user cache directory for the CLI."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.environ.get("LOCALAPPDATA") or os.path.expanduser("~/.cache")
+    path = os.path.join(base, "platform-cli")
+    os.makedirs(path, exist_ok=True)
+    return path
+
 def yes_no_prompt(message):
     """Ask user yes/no, return True only if yes."""
     answer = input(f"{message} (yes/no): ").strip().lower()